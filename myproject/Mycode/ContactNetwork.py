@@ -3,8 +3,9 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
-import matplotlib.pyplot as plt
-import networkx as nx
+
+# 人口生成算法版本：改变 create_custom_population 的随机抽样方式时递增，使各脚本磁盘上的人口缓存失效
+POPULATION_VERSION = 2
 
 def validate_countries_config(countries_config):
     '''
@@ -65,6 +66,29 @@ def validate_countries_config(countries_config):
     
     return country_names, proportions
 
+def _make_scale_free(indices, config):
+    '''无标度网络，使用 indices 作为映射'''
+    return cv.make_scale_free_contacts(len(indices), m_connections=config.get('m_connections', 2), mapping=indices)
+
+def _make_microstructured(indices, config):
+    '''聚类结构（微结构化网络），生成后映射回 indices 中的原始索引；如果有 beta 属性，也保留'''
+    temp_contacts = cv.make_microstructured_contacts(len(indices), cluster_size=config.get('cluster_size', 3.0))
+    contacts = {'p1': indices[temp_contacts['p1']], 'p2': indices[temp_contacts['p2']]}
+    if 'beta' in temp_contacts:
+        contacts['beta'] = temp_contacts['beta']
+    return contacts
+
+def _make_random(indices, config):
+    '''随机接触，使用 indices 作为映射'''
+    return cv.make_random_contacts(len(indices), n=config.get('n_contacts', 10), mapping=indices)
+
+# 网络类型名 -> 组内接触网生成函数 (indices, config) -> {'p1', 'p2'[, 'beta']}
+_NETWORK_FACTORIES = {
+    Enums.NetWorkType.scale_free.name: _make_scale_free,
+    Enums.NetWorkType.microstructured.name: _make_microstructured,
+    Enums.NetWorkType.random.name: _make_random,
+}
+
 def create_custom_population(pop_size, layer_config, countries_config, seed=None):
     '''
     创建完全自定义的人口
@@ -89,99 +113,65 @@ def create_custom_population(pop_size, layer_config, countries_config, seed=None
     # 校验 countries_config 并获取国家名和比例列表
     country_names, proportions = validate_countries_config(countries_config)
     
-    # 创建基本属性
+    # 创建基本属性：年龄、性别、国家所需的均匀随机数由 PCG64 一次批量生成（每人一行 3 个），
+    # 其种子取自已设种子的全局流，seed 相同时人口仍可复现
     uids = np.arange(pop_size, dtype=cv.default_int)
-    ages = np.random.uniform(18, 65, pop_size)
-    sexes = np.random.binomial(1, 0.5, pop_size)
+    u = np.random.default_rng(np.random.randint(2**31)).random((3, pop_size))
+    ages = 18 + 47 * u[0]  # U(18, 65)
+    sexes = (u[1] < 0.5).astype(np.int64)  # Bernoulli(0.5)
     
-    # 根据 countries_config 生成 countries 数组
-    # 使用 np.random.choice 根据比例随机分配
-    countries = np.random.choice(country_names, size=pop_size, p=proportions)
-    # 初始时 position = country，便于跨境时区分（流动者 position 可单独更新）
-    positions = np.array(countries, dtype=object)
+    # 根据 countries_config 生成 countries 数组：按比例累积分布对均匀数做 searchsorted 得到国家编号（country_names 中的下标）；
+    # country_code 以 int8 保存，供按区域筛选时做整数比较而非字符串比较
+    country_code = np.searchsorted(np.cumsum(proportions), u[2], side='right')
+    country_code = np.minimum(country_code, len(country_names) - 1).astype(np.int8)  # 防止累积和的舍入误差越界
+    countries = np.asarray(country_names)[country_code]
+    # 初始时 position = country，便于跨境时区分（流动者 position 可单独更新）；
+    # 与 countries 同为定长 Unicode 数组（非 object），按区域名比较时是连续内存上的向量化比较，不逐个调用 Python 对象比较
+    positions = countries.copy()
 
-    # 创建接触网络
-    contacts = cv.Contacts()
-    layer_keys = []
+    # 各层先收集到普通 dict，循环结束后一次性加入 Contacts
+    layers = {}
+    # 各 country 组的人员索引只算一次（按 int8 编码分组，组顺序与按国家名排序一致），各层共用
+    country_groups = [np.flatnonzero(country_code == code) for code in np.argsort(country_names)]
     
     for layer_name, config in layer_config.items():
-        layer_keys.append(layer_name)
+        # 网络类型对应的生成函数按层查表一次，不在每个 country 组内逐个比较
+        factory = _NETWORK_FACTORIES.get(config.get('network_type'))
         
         # 按 country 分组，只允许相同 country 的人之间建立连接
-        unique_countries = np.unique(countries)
         all_p1 = []
         all_p2 = []
         
         # 为每个 country 分别生成网络
-        for country in unique_countries:
-            # 筛选出该 country 的所有人员索引
-            country_mask = countries == country
-            country_indices = np.where(country_mask)[0]
-            
+        for country_indices in country_groups:
             if len(country_indices) == 0:
                 continue  # 跳过空组
             
             # 在该 country 组内，根据年龄范围进一步筛选（如果有）
             if config.get('age_range') is not None:
                 min_age, max_age = config['age_range']
-                age_mask = (ages[country_indices] >= min_age) & (ages[country_indices] < max_age)
-                filtered_indices = country_indices[age_mask]
+                group_ages = ages[country_indices]
+                filtered_indices = country_indices[(group_ages >= min_age) & (group_ages < max_age)]
             else:
                 filtered_indices = country_indices
             
             if len(filtered_indices) == 0:
                 continue  # 跳过没有符合年龄条件的人员的组
             
-            # 根据网络类型生成该 country 组的接触网络
-            if config.get('network_type') == Enums.NetWorkType.scale_free.name:
-                # 使用无标度网络
-                m = config.get('m_connections', 2)
-                # 为这个 country 组生成无标度网络，使用 filtered_indices 作为映射
-                country_contacts = cv.make_scale_free_contacts(
-                    len(filtered_indices), 
-                    m_connections=m, 
-                    mapping=filtered_indices
-                )
-                
-            elif config.get('network_type') == Enums.NetWorkType.microstructured.name:
-                # 使用聚类结构
-                cluster_size = config.get('cluster_size', 3.0)
-                # 为这个 country 组生成微结构化网络
-                temp_contacts = cv.make_microstructured_contacts(
-                    len(filtered_indices), 
-                    cluster_size=cluster_size
-                )
-                # 映射回原始索引
-                country_contacts = {
-                    'p1': filtered_indices[temp_contacts['p1']],
-                    'p2': filtered_indices[temp_contacts['p2']]
-                }
-                # 如果有 beta 属性，也保留
-                if 'beta' in temp_contacts:
-                    country_contacts['beta'] = temp_contacts['beta']
-                    
-            elif config.get('network_type') == Enums.NetWorkType.random.name:
-                # 使用随机接触
-                n_contacts = config.get('n_contacts', 10)
-                # 为这个 country 组生成随机网络
-                country_contacts = cv.make_random_contacts(
-                    len(filtered_indices), 
-                    n=n_contacts, 
-                    mapping=filtered_indices
-                )
-            else:
-                # 未知的网络类型，跳过
+            # 根据网络类型生成该 country 组的接触网络（未知的网络类型跳过）
+            if factory is None:
                 continue
+            country_contacts = factory(filtered_indices, config)
             
-            # 收集该 country 组的连接
-            all_p1.extend(country_contacts['p1'])
-            all_p2.extend(country_contacts['p2'])
+            # 收集该 country 组的连接（保留为数组，合并时一次 concatenate，不逐元素转成 Python 列表）
+            all_p1.append(country_contacts['p1'])
+            all_p2.append(country_contacts['p2'])
         
         # 合并所有 country 组的连接
         if len(all_p1) > 0:
             layer_contacts = {
-                'p1': np.array(all_p1, dtype=cv.default_int),
-                'p2': np.array(all_p2, dtype=cv.default_int)
+                'p1': np.concatenate(all_p1).astype(cv.default_int, copy=False),
+                'p2': np.concatenate(all_p2).astype(cv.default_int, copy=False)
             }
             # 如果有 beta 属性，也合并（通常随机网络没有，无标度和微结构化可能有）
             # 这里简化处理，如果需要可以进一步优化
@@ -193,8 +183,12 @@ def create_custom_population(pop_size, layer_config, countries_config, seed=None
             }
         
         # 创建层
-        layer = cv.Layer(**layer_contacts, label=layer_name)
-        contacts.add_layer(**{layer_name: layer})
+        layers[layer_name] = cv.Layer(**layer_contacts, label=layer_name)
+
+    # 创建接触网络：add_layer 一次接收全部层（逐层校验），层键顺序即 layer_config 的顺序
+    contacts = cv.Contacts()
+    contacts.add_layer(**layers)
+    layer_keys = list(layers)
     
     # 创建人口字典
     popdict = {
@@ -208,7 +202,45 @@ def create_custom_population(pop_size, layer_config, countries_config, seed=None
 
         # 添加自定义属性（如果需要，可以在函数参数中添加更多自定义属性）
         'country': countries,
+        'country_code': country_code,  # countries 的 int8 编码，country_names[country_code] == countries
         'position': positions,  # 初始等于 country，跨境时可单独更新以区分所在地
     }
     
     return popdict, layer_keys
+
+# 人口缓存目录（gzip 压缩 pickle）：按本文件位置定位到 myproject/cache，与 .gitignore 对应，不依赖当前工作目录
+POP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cache')
+
+def load_or_build_popdict(build, key, cache_dir=None):
+    '''
+    读取或创建并缓存人口，返回 build() 的结果。
+
+    缓存文件名由 key 与 POPULATION_VERSION 的哈希确定；重复运行及 cv.parallel 子进程重新导入脚本时
+    直接读取，不再重建网络，修改 key 中任一参数会得到新的缓存文件。
+
+    Args:
+        build: 无参函数，创建要缓存的人口（如 popdict 或 (popdict, layer_keys)）
+        key: list，决定人口的全部参数（人口规模、随机种子、网络配置等），须可被 sc.sha 哈希
+        cache_dir: 缓存目录，默认 POP_CACHE_DIR
+    '''
+    cache_dir = POP_CACHE_DIR if cache_dir is None else cache_dir
+    key_hash = sc.sha([POPULATION_VERSION, key]).hexdigest()[:12]
+    cache_path = os.path.join(cache_dir, f'pop_{key_hash}.pkl.gz')
+    if os.path.exists(cache_path):
+        return sc.load(cache_path)
+
+    pop = build()
+    os.makedirs(cache_dir, exist_ok=True)
+    sc.save(cache_path, pop)
+    return pop
+
+def build_pop(pop_size, layer_config, countries_config, seed=None, cache_dir=None):
+    '''create_custom_population 的缓存版本，返回 (popdict, layer_keys)，缓存规则见 load_or_build_popdict。
+    seed 为 None 时网络每次随机生成，不能跨运行复用，直接创建而不读写缓存。'''
+    if seed is None:
+        return create_custom_population(pop_size, layer_config, countries_config)
+    return load_or_build_popdict(
+        lambda: create_custom_population(pop_size, layer_config, countries_config, seed=seed),
+        [pop_size, layer_config, countries_config, seed],
+        cache_dir=cache_dir,
+    )
@@ -1,6 +1,25 @@
 import numpy as np
 import covasim as cv
 
+# 候鸟出行目的编码（popdict['crosser_purpose_code']），PURPOSE_NAMES[code] 即对应的 crosser_purpose 字符串
+PURPOSE_WORK = 0
+PURPOSE_VISIT = 1
+PURPOSE_UNDOCUMENTED = 2
+PURPOSE_NONE = 255  # 非候鸟
+PURPOSE_NAMES = np.array(['work', 'visit', 'undocumented'], dtype=object)
+
+
+def _make_cross_layer(p1, p2, cross_beta, label):
+    '''
+    构造跨区层：beta 由 cv.Layer 按边数分配一次后原地填充为 cross_beta。
+
+    不预先 np.full 再传入，因为 cv.Layer 会对传入数组再复制一份；beta 也不能用标量或
+    np.broadcast_to 只读视图代替，CrosserTravel / CrosserTravelMultilayer 每日逐边改写该数组。
+    '''
+    layer = cv.Layer(p1=p1, p2=p2, label=label)
+    layer['beta'].fill(cross_beta)
+    return layer
+
 
 def add_cross_layer(
     popdict,
@@ -15,7 +34,8 @@ def add_cross_layer(
     在已有 popdict 上添加跨区接触层（仅流动人口有跨区边）。
 
     会就地修改 popdict：新增 'crosser' 布尔属性；在 contacts 中新增 'cross' 层；
-    若有至少两个区域则向 popdict['layer_keys'] 追加 'cross'。
+    若有至少两个区域则将 popdict['layer_keys'] 重新赋值为追加 'cross' 后的新列表
+    （不在原列表上 append，避免修改 create_custom_population 返回的 layer_keys 等共享引用）。
 
     注：本函数仅做静态网络与 crosser 标记。若需「跨境时 cross 权重 1、base 权重 0，回国时相反」
     以及「每日从境内候鸟中按比例随机出境、境外停留 1–7 天」等动态行为，请在仿真中使用
@@ -50,7 +70,7 @@ def add_cross_layer(
     if len(inds_A) == 0 or len(inds_B) == 0:
         return popdict
 
-    rng = np.random.RandomState(cross_layer_seed)
+    rng = np.random.default_rng(cross_layer_seed)
     n_travelers_A = max(1, int(frac_travelers * len(inds_A)))
     n_travelers_B = max(1, int(frac_travelers * len(inds_B)))
     travelers_A = rng.choice(inds_A, size=n_travelers_A, replace=False)
@@ -58,27 +78,17 @@ def add_cross_layer(
     popdict['crosser'][travelers_A] = True
     popdict['crosser'][travelers_B] = True
 
-    p1_cross_list = []
-    p2_cross_list = []
-    for a in travelers_A:
-        partners = rng.choice(inds_B, size=n_cross_per_person, replace=True)
-        for b in partners:
-            p1_cross_list.append(a)
-            p2_cross_list.append(b)
-    for b in travelers_B:
-        partners = rng.choice(inds_A, size=n_cross_per_person, replace=True)
-        for a in partners:
-            p1_cross_list.append(b)
-            p2_cross_list.append(a)
-
-    p1_cross = np.array(p1_cross_list, dtype=cv.default_int)
-    p2_cross = np.array(p2_cross_list, dtype=cv.default_int)
-    n_cross = len(p1_cross)
-    beta_cross = np.full(n_cross, cross_beta, dtype=cv.default_float)
-
-    cross_layer = cv.Layer(p1=p1_cross, p2=p2_cross, beta=beta_cross, label='cross')
+    # 每个流动者一次性抽取 n_cross_per_person 个对方区域的伙伴（有放回），按行展开为边
+    partners_A = inds_B[rng.integers(0, inds_B.size, size=(travelers_A.size, n_cross_per_person))]
+    partners_B = inds_A[rng.integers(0, inds_A.size, size=(travelers_B.size, n_cross_per_person))]
+    p1_cross = np.concatenate([
+        np.repeat(travelers_A, n_cross_per_person),
+        np.repeat(travelers_B, n_cross_per_person),
+    ]).astype(cv.default_int)
+    p2_cross = np.concatenate([partners_A.ravel(), partners_B.ravel()]).astype(cv.default_int)
+    cross_layer = _make_cross_layer(p1_cross, p2_cross, cross_beta, label='cross')
     popdict['contacts'].add_layer(cross=cross_layer)
-    popdict['layer_keys'].append('cross')
+    popdict['layer_keys'] = list(popdict['layer_keys']) + ['cross']
 
     return popdict
 
@@ -101,6 +111,8 @@ def add_cross_layer_multilayer(
     候鸟按目的分为务工、探亲、偷渡，预建 cross_work、cross_community、cross_home 三个静态跨区层。
     务工：cross_work + cross_community；探亲：cross_home + cross_community；偷渡：仅 cross_community。
     跨境时的激活由 CrosserTravelMultilayer 通过 beta 控制实现。
+    与 add_cross_layer 相同，popdict['layer_keys'] 每次均重新赋值为新列表，不修改原列表。
+    出行目的同时写入 crosser_purpose（字符串）与 crosser_purpose_code（uint8，编码见 PURPOSE_NAMES）。
 
     Args:
         popdict: 人口字典，须含 country、age、contacts、layer_keys，且 contacts 含 home/school/work/community
@@ -141,7 +153,7 @@ def add_cross_layer_multilayer(
     if len(inds_A_work) == 0:
         inds_A_work = inds_A
 
-    rng = np.random.RandomState(cross_layer_seed)
+    rng = np.random.default_rng(cross_layer_seed)
     n_travelers_A = max(1, int(frac_travelers * len(inds_A)))
     n_travelers_B = max(1, int(frac_travelers * len(inds_B)))
     travelers_A = rng.choice(inds_A, size=n_travelers_A, replace=False)
@@ -161,89 +173,82 @@ def add_cross_layer_multilayer(
     popdict['crosser'][travelers_B] = True
 
     # crosser_purpose: 'work' | 'visit' | 'undocumented'
+    # crosser_purpose_code: 同一信息的 uint8 编码（见 PURPOSE_NAMES），非候鸟为 PURPOSE_NONE，
+    # 供按目的计数/筛选时用整数比较或 np.bincount 代替逐元素字符串比较
+    crosser_purpose_code = np.full(pop_size, PURPOSE_NONE, dtype=np.uint8)
+    for tinds in [travelers_A, travelers_B]:
+        r = rng.random(len(tinds))
+        crosser_purpose_code[tinds] = (r >= p_work).astype(np.uint8) + (r >= p_work + p_visit)
     crosser_purpose = np.empty(pop_size, dtype=object)
     crosser_purpose[:] = ''
-    for tinds in [travelers_A, travelers_B]:
-        n = len(tinds)
-        r = rng.random(n)
-        work_mask = r < p_work
-        visit_mask = (r >= p_work) & (r < p_work + p_visit)
-        undoc_mask = r >= p_work + p_visit
-        crosser_purpose[tinds] = np.where(work_mask, 'work', np.where(visit_mask, 'visit', 'undocumented'))
+    is_crosser = crosser_purpose_code != PURPOSE_NONE
+    crosser_purpose[is_crosser] = PURPOSE_NAMES[crosser_purpose_code[is_crosser]]
     popdict['crosser_purpose'] = crosser_purpose
+    popdict['crosser_purpose_code'] = crosser_purpose_code
 
     # undocumented: 偷渡候鸟标记，供 make_subtarget_crosser_exclude_undocumented 排除边境检测
-    popdict['undocumented'] = np.zeros(pop_size, dtype=bool)
-    for tinds in [travelers_A, travelers_B]:
-        undoc_mask = (crosser_purpose[tinds] == 'undocumented')
-        popdict['undocumented'][tinds[undoc_mask]] = True
+    popdict['undocumented'] = crosser_purpose_code == PURPOSE_UNDOCUMENTED
 
     # 预建跨区层
     def make_cross_edges(crosser_inds, partner_inds, rng, n_per_person):
-        p1_list, p2_list = [], []
-        for c in crosser_inds:
-            partners = rng.choice(partner_inds, size=n_per_person, replace=True)
-            for p in partners:
-                p1_list.append(c)
-                p2_list.append(p)
-        return np.array(p1_list, dtype=cv.default_int), np.array(p2_list, dtype=cv.default_int)
+        partners = partner_inds[rng.integers(0, partner_inds.size, size=(crosser_inds.size, n_per_person))]
+        p1 = np.repeat(crosser_inds, n_per_person).astype(cv.default_int)
+        p2 = partners.ravel().astype(cv.default_int)
+        return p1, p2
 
     # cross_work: 务工候鸟 <-> 对方工作层人员
-    work_A = travelers_A[crosser_purpose[travelers_A] == 'work']
-    work_B = travelers_B[crosser_purpose[travelers_B] == 'work']
+    work_A = travelers_A[crosser_purpose_code[travelers_A] == PURPOSE_WORK]
+    work_B = travelers_B[crosser_purpose_code[travelers_B] == PURPOSE_WORK]
     p1_w, p2_w = [], []
     if len(work_A) > 0:
         a1, a2 = make_cross_edges(work_A, inds_B_work, rng, n_cross_per_person)
-        p1_w.extend(a1)
-        p2_w.extend(a2)
+        p1_w.append(a1)
+        p2_w.append(a2)
     if len(work_B) > 0:
         b1, b2 = make_cross_edges(work_B, inds_A_work, rng, n_cross_per_person)
-        p1_w.extend(b1)
-        p2_w.extend(b2)
+        p1_w.append(b1)
+        p2_w.append(b2)
     if len(p1_w) > 0:
-        p1_w = np.array(p1_w, dtype=cv.default_int)
-        p2_w = np.array(p2_w, dtype=cv.default_int)
-        beta_w = np.full(len(p1_w), cross_beta, dtype=cv.default_float)
-        layer_w = cv.Layer(p1=p1_w, p2=p2_w, beta=beta_w, label='cross_work')
+        p1_w = np.concatenate(p1_w)
+        p2_w = np.concatenate(p2_w)
+        layer_w = _make_cross_layer(p1_w, p2_w, cross_beta, label='cross_work')
         popdict['contacts'].add_layer(cross_work=layer_w)
-        popdict['layer_keys'].append('cross_work')
+        popdict['layer_keys'] = list(popdict['layer_keys']) + ['cross_work']
 
     # cross_community: 所有候鸟 <-> 对方全员
     p1_c, p2_c = [], []
     if len(travelers_A) > 0:
         a1, a2 = make_cross_edges(travelers_A, inds_B, rng, n_cross_per_person)
-        p1_c.extend(a1)
-        p2_c.extend(a2)
+        p1_c.append(a1)
+        p2_c.append(a2)
     if len(travelers_B) > 0:
         b1, b2 = make_cross_edges(travelers_B, inds_A, rng, n_cross_per_person)
-        p1_c.extend(b1)
-        p2_c.extend(b2)
+        p1_c.append(b1)
+        p2_c.append(b2)
     if len(p1_c) > 0:
-        p1_c = np.array(p1_c, dtype=cv.default_int)
-        p2_c = np.array(p2_c, dtype=cv.default_int)
-        beta_c = np.full(len(p1_c), cross_beta, dtype=cv.default_float)
-        layer_c = cv.Layer(p1=p1_c, p2=p2_c, beta=beta_c, label='cross_community')
+        p1_c = np.concatenate(p1_c)
+        p2_c = np.concatenate(p2_c)
+        layer_c = _make_cross_layer(p1_c, p2_c, cross_beta, label='cross_community')
         popdict['contacts'].add_layer(cross_community=layer_c)
-        popdict['layer_keys'].append('cross_community')
+        popdict['layer_keys'] = list(popdict['layer_keys']) + ['cross_community']
 
     # cross_home: 探亲候鸟 <-> 对方全员
-    visit_A = travelers_A[crosser_purpose[travelers_A] == 'visit']
-    visit_B = travelers_B[crosser_purpose[travelers_B] == 'visit']
+    visit_A = travelers_A[crosser_purpose_code[travelers_A] == PURPOSE_VISIT]
+    visit_B = travelers_B[crosser_purpose_code[travelers_B] == PURPOSE_VISIT]
     p1_h, p2_h = [], []
     if len(visit_A) > 0:
         a1, a2 = make_cross_edges(visit_A, inds_B, rng, n_cross_per_person)
-        p1_h.extend(a1)
-        p2_h.extend(a2)
+        p1_h.append(a1)
+        p2_h.append(a2)
     if len(visit_B) > 0:
         b1, b2 = make_cross_edges(visit_B, inds_A, rng, n_cross_per_person)
-        p1_h.extend(b1)
-        p2_h.extend(b2)
+        p1_h.append(b1)
+        p2_h.append(b2)
     if len(p1_h) > 0:
-        p1_h = np.array(p1_h, dtype=cv.default_int)
-        p2_h = np.array(p2_h, dtype=cv.default_int)
-        beta_h = np.full(len(p1_h), cross_beta, dtype=cv.default_float)
-        layer_h = cv.Layer(p1=p1_h, p2=p2_h, beta=beta_h, label='cross_home')
+        p1_h = np.concatenate(p1_h)
+        p2_h = np.concatenate(p2_h)
+        layer_h = _make_cross_layer(p1_h, p2_h, cross_beta, label='cross_home')
         popdict['contacts'].add_layer(cross_home=layer_h)
-        popdict['layer_keys'].append('cross_home')
+        popdict['layer_keys'] = list(popdict['layer_keys']) + ['cross_home']
 
     return popdict
@@ -2,7 +2,6 @@
 Plotting utilities for Covasim contact networks.
 """
 import numpy as np
-import networkx as nx
 import matplotlib.pyplot as plt
 
 try:
@@ -12,6 +11,12 @@ except ImportError:
     _has_covasim = False
 
 
+def setup_chinese_font():
+    '''设置 matplotlib 显示中文（Windows 常用 SimHei / 微软雅黑），并解决负号显示为方框；各脚本绘图前调用一次。'''
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
+    plt.rcParams['axes.unicode_minus'] = False
+
+
 def plot_contact_network(G, layers=None, size=None, figsize=(10, 8), layout='spring', seed=None, **draw_kwargs):
     """
     Draw a contact network (from sim.people.to_graph()).
@@ -26,6 +31,8 @@ def plot_contact_network(G, layers=None, size=None, figsize=(10, 8), layout='spr
         seed: int | None. Random seed for node sampling when size is set.
         **draw_kwargs: Passed to nx.draw (e.g. node_size, alpha, font_size).
     """
+    import networkx as nx  # 仅绘图时需要；分析器随 cv.parallel 子进程导入本模块时不加载
+
     if not G.number_of_nodes():
         return
     rng = np.random.RandomState(seed)
@@ -118,6 +125,8 @@ def plot_two_country_networks(G, sample_size=50, seed=1, figsize=(14, 7), offset
         figsize: figure size (width, height).
         offset: horizontal offset of the two layouts (A shifted left by offset, B right by offset).
     """
+    import networkx as nx
+
     nodes_A = [n for n in G.nodes() if _get_node_country(G, n) == 'A']
     nodes_B = [n for n in G.nodes() if _get_node_country(G, n) == 'B']
     if not nodes_A or not nodes_B:
@@ -224,6 +233,7 @@ if _has_covasim:
             self.country_key = country_key
             self.regions = list(regions)
             self.region_data = None
+            self._region_masks = None
 
         def initialize(self, sim=None):
             super().initialize(sim)
@@ -239,6 +249,12 @@ if _has_covasim:
                     **{k: np.zeros(n_pts, dtype=float) for k in keys_stock},
                     **{k: np.zeros(n_pts, dtype=float) for k in keys_severity},
                 }
+            # country 整个仿真不变：各区成员掩码只算一次，apply 不再逐日做字符串比较
+            try:
+                country_arr = np.asarray(sim.people[self.country_key])
+            except Exception:
+                return
+            self._region_masks = {r: country_arr == r for r in self.regions}
             return
 
         def apply(self, sim):
@@ -255,7 +271,7 @@ if _has_covasim:
             if t < 0 or t >= len(self.region_data[self.regions[0]]['t']):
                 return
             for region in self.regions:
-                inds = (country_arr == region)
+                inds = self._region_masks[region] if self._region_masks is not None else (country_arr == region)
                 if not np.any(inds):
                     continue
                 p = people
@@ -312,6 +328,11 @@ if _has_covasim:
                 self.region_data[region]['n_dead'][t] = np.count_nonzero(dead_inds)
             return
 
+        def finalize(self, sim=None):
+            super().finalize()
+            self._region_masks = None  # 仅运行期使用，不随 sim 文件保存
+            return
+
 
 def plot_two_country_epidemic_curves(
     sim,
@@ -622,7 +643,38 @@ def plot_layer_region_infections(
     return fig
 
 
+def plot_sims_lines(ax, sims, key='cum_infections', linewidth=1.5):
+    '''
+    把多个 sim 的同一结果曲线（默认累计感染人数）画在同一坐标轴上。
+
+    所有曲线合成一个 LineCollection（一个 artist、一次绘制），多情景敏感性分析时比逐条 ax.plot 快得多；
+    图例用 Line2D 代理按 sim.label 构造。
+
+    参数：
+      ax: matplotlib Axes
+      sims: 已运行的 sim 列表（如 msim.sims）
+      key: sim.results 中的结果名，默认 'cum_infections'
+      linewidth: 线宽，默认 1.5
+
+    返回：
+      LineCollection 对象
+    '''
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    segs = [np.column_stack([sim.results['t'], sim.results[key].values]) for sim in sims]
+    colors = plt.cm.tab10(np.arange(len(segs)) % 10)
+    lc = LineCollection(segs, colors=colors, linewidths=linewidth)
+    ax.add_collection(lc)
+    ax.autoscale()
+    handles = [Line2D([], [], color=c, linewidth=linewidth) for c in colors]
+    ax.legend(handles, [sim.label for sim in sims])
+    return lc
+
+
 if __name__ == '__main__':
+    import networkx as nx
+
     # Minimal example: small graph with layer attribute (no dependency on cross_network)
     G = nx.MultiDiGraph()
     G.add_edge(0, 1, key=0, layer='base', weight=1.0)
@@ -32,6 +32,7 @@
 """
 import sys
 import os
+from functools import partial
 
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if _project_root not in sys.path:
@@ -57,10 +58,7 @@ from my_utils import (
     sequence_random,
 )
 
-# 设置 matplotlib 显示中文
-import matplotlib
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False
+MyPlot.setup_chinese_font()
 
 # ================== 1. 网络层配置 ==================
 custom_config = {
@@ -131,21 +129,34 @@ _scenario_a_start_round3 = 34
 _scenario_a_start_round4 = 42
 
 # ================== 5. 多层级常规策略干预 ==================
+# 各干预以 partial 工厂形式定义，情景为工厂元组；get_scenario 每次调用生成全新的干预实例，
+# 避免同一干预对象在多个情景 / 多个 sim 间共享状态
+SCENARIO_SPECS = {'baseline': ()}
+
+
+def get_scenario(name):
+    """按情景名（'baseline'、'case01'~'case06'）生成该情景的干预列表。"""
+    return [factory() for factory in SCENARIO_SPECS[name]]
+
+
 # 跨境移动
-crosser_travel_ml = CrosserTravelMultilayer(
+crosser_travel_ml = partial(
+    CrosserTravelMultilayer,
     frac_cross_per_day=0.1,
     duration_min=1,
     duration_max=7,
     start_day=_scenario_a_start_round1,
 )
 # 口罩：工作层、学校层，仅 A 区，100% 依从性，efficacy=0.5
-mask_work_school_a = MaskWearingLayerSpecific(
+mask_work_school_a = partial(
+    MaskWearingLayerSpecific,
     layers=['work', 'school'],
     efficacy=0.5,
     start_day=_scenario_a_start_round1,
 )
 # 边境检测：合法入境在 A 区的候鸟，80% 有症状 / 10% 无症状
-test_crosser_legal = cv.test_prob(
+test_crosser_legal = partial(
+    cv.test_prob,
     symp_prob=0.8,
     asymp_prob=0.1,
     test_delay=1,
@@ -154,21 +165,23 @@ test_crosser_legal = cv.test_prob(
 )
 
 # ================== 场景一：仅常规策略 ==================
-intervention_scenario_case01 = [
+SCENARIO_SPECS['case01'] = (
     crosser_travel_ml,
     mask_work_school_a,
     test_crosser_legal,
-]
+)
 
 # ================== 场景二：常规 + 升级（round2 起） ==================
 # 口罩：round2 起扩展至社区、工作、家庭层（学校停课无需口罩）
-mask_community_work_home_phase2 = MaskWearingLayerSpecific(
+mask_community_work_home_phase2 = partial(
+    MaskWearingLayerSpecific,
     layers=['community', 'work', 'home'],
     efficacy=0.5,
     start_day=_scenario_a_start_round2,
 )
 # 境内检测：round2 起 A 区 40% 有症状 / 1% 无症状（升级策略文档）
-test_isolate_a_phase2 = cv.test_prob(
+test_isolate_a_phase2 = partial(
+    cv.test_prob,
     symp_prob=0.4,
     asymp_prob=0.01,
     start_day=_scenario_a_start_round2,
@@ -176,19 +189,21 @@ test_isolate_a_phase2 = cv.test_prob(
     subtarget=make_subtarget_position(),
 )
 # 接触者追踪：round2 起 A 区 40% 追踪
-contact_tracing_phase2 = ContactTracingAOnly(
+contact_tracing_phase2 = partial(
+    ContactTracingAOnly,
     trace_probs=0.4,
     trace_time=2,
     start_day=_scenario_a_start_round2,
 )
 # 学校停课：round2 起 A 区学校层全部移除
-school_close_a_phase2 = SchoolCloseA(start_day=_scenario_a_start_round2)
+school_close_a_phase2 = partial(SchoolCloseA, start_day=_scenario_a_start_round2)
 # 社区层：round2 起保留 50% 边
-community_restrict_a_phase2 = CommunityRestrictA(start_day=_scenario_a_start_round2, fraction=0.5)
+community_restrict_a_phase2 = partial(CommunityRestrictA, start_day=_scenario_a_start_round2, fraction=0.5)
 # 工作层：round2 起保留 50% 边
-work_from_home_a_phase2 = WorkFromHomeA(start_day=_scenario_a_start_round2, fraction=0.5)
+work_from_home_a_phase2 = partial(WorkFromHomeA, start_day=_scenario_a_start_round2, fraction=0.5)
 # 疫苗：round2 起 A 区 10000 剂
-vaccinate_a_10k_phase2 = cv.vaccinate_num(
+vaccinate_a_10k_phase2 = partial(
+    cv.vaccinate_num,
     vaccine='pfizer',
     num_doses={_scenario_a_start_round2: 10000},
     sequence=sequence_random,
@@ -197,7 +212,8 @@ vaccinate_a_10k_phase2 = cv.vaccinate_num(
 
 # ================== 场景三：常规 + 升级 + 严控（round3 起） ==================
 # 跨境：round3 起停止派出
-crosser_travel_ml_case03 = CrosserTravelMultilayer(
+crosser_travel_ml_case03 = partial(
+    CrosserTravelMultilayer,
     frac_cross_per_day=0.1,
     duration_min=1,
     duration_max=7,
@@ -205,7 +221,8 @@ crosser_travel_ml_case03 = CrosserTravelMultilayer(
     end_day_outbound=_scenario_a_start_round3,
 )
 # 边境检测：round3 前一天结束
-test_crosser_legal_case03 = cv.test_prob(
+test_crosser_legal_case03 = partial(
+    cv.test_prob,
     symp_prob=0.8,
     asymp_prob=0.1,
     test_delay=1,
@@ -214,7 +231,8 @@ test_crosser_legal_case03 = cv.test_prob(
     subtarget=make_subtarget_crosser_exclude_undocumented(crosser_prob=1.0),
 )
 # 境内检测：phase2 至 round3 前，phase3 严控阶段（概率与 phase2 一致）
-test_isolate_a_phase2_case03 = cv.test_prob(
+test_isolate_a_phase2_case03 = partial(
+    cv.test_prob,
     symp_prob=0.4,
     asymp_prob=0.01,
     start_day=_scenario_a_start_round2,
@@ -222,7 +240,8 @@ test_isolate_a_phase2_case03 = cv.test_prob(
     test_delay=2,
     subtarget=make_subtarget_position(),
 )
-test_isolate_a_phase3 = cv.test_prob(
+test_isolate_a_phase3 = partial(
+    cv.test_prob,
     symp_prob=0.4,
     asymp_prob=0.01,
     start_day=_scenario_a_start_round3,
@@ -230,36 +249,40 @@ test_isolate_a_phase3 = cv.test_prob(
     subtarget=make_subtarget_position(),
 )
 # 接触者追踪：phase2 至 round3 前，phase3 严控
-contact_tracing_phase2_case03 = ContactTracingAOnly(
+contact_tracing_phase2_case03 = partial(
+    ContactTracingAOnly,
     trace_probs=0.4,
     trace_time=2,
     start_day=_scenario_a_start_round2,
     end_day=_scenario_a_start_round3 - 1,
 )
-contact_tracing_phase3 = ContactTracingAOnly(
+contact_tracing_phase3 = partial(
+    ContactTracingAOnly,
     trace_probs=0.4,
     trace_time=2,
     start_day=_scenario_a_start_round3,
 )
 # 工作层：round3 起全面停工（移除剩余边）
-work_from_home_a_phase3 = WorkFromHomeA(start_day=_scenario_a_start_round3, fraction=0)
+work_from_home_a_phase3 = partial(WorkFromHomeA, start_day=_scenario_a_start_round3, fraction=0)
 # 社区层：round3 起增强限制（对剩余边再保留 40%，最终约 20%）
-community_restrict_a_phase3 = CommunityRestrictA(start_day=_scenario_a_start_round3, fraction=0.4)
+community_restrict_a_phase3 = partial(CommunityRestrictA, start_day=_scenario_a_start_round3, fraction=0.4)
 # 疫苗：round3 起 A 区第三批、B 区
-vaccinate_a_10k_phase3 = cv.vaccinate_num(
+vaccinate_a_10k_phase3 = partial(
+    cv.vaccinate_num,
     vaccine='pfizer',
     num_doses={_scenario_a_start_round3: 10000},
     sequence=sequence_random,
     subtarget=make_subtarget_position(),
 )
-vaccinate_b_5000 = cv.vaccinate_num(
+vaccinate_b_5000 = partial(
+    cv.vaccinate_num,
     vaccine='pfizer',
     num_doses={_scenario_a_start_round3: 5000},
     sequence=sequence_random,
     subtarget=make_subtarget_position(region_name='B'),
 )
 
-intervention_scenario_case03 = [
+SCENARIO_SPECS['case03'] = (
     crosser_travel_ml_case03,
     mask_work_school_a,
     mask_community_work_home_phase2,
@@ -276,9 +299,9 @@ intervention_scenario_case03 = [
     vaccinate_a_10k_phase2,
     vaccinate_a_10k_phase3,
     vaccinate_b_5000,
-]
+)
 
-intervention_scenario_case02 = [
+SCENARIO_SPECS['case02'] = (
     crosser_travel_ml,
     mask_work_school_a,
     mask_community_work_home_phase2,
@@ -289,24 +312,27 @@ intervention_scenario_case02 = [
     community_restrict_a_phase2,
     work_from_home_a_phase2,
     vaccinate_a_10k_phase2,
-]
+)
 
 # ================== 场景四：常规 + 升级 → round4 起温和策略 ==================
 # 口罩：round4 前结束
-mask_work_school_a_case04 = MaskWearingLayerSpecific(
+mask_work_school_a_case04 = partial(
+    MaskWearingLayerSpecific,
     layers=['work', 'school'],
     efficacy=0.5,
     start_day=_scenario_a_start_round1,
     end_day=_scenario_a_start_round4 - 1,
 )
-mask_community_work_home_case04 = MaskWearingLayerSpecific(
+mask_community_work_home_case04 = partial(
+    MaskWearingLayerSpecific,
     layers=['community', 'work', 'home'],
     efficacy=0.5,
     start_day=_scenario_a_start_round2,
     end_day=_scenario_a_start_round4 - 1,
 )
 # 境内检测：round4 前结束
-test_isolate_a_phase2_case04 = cv.test_prob(
+test_isolate_a_phase2_case04 = partial(
+    cv.test_prob,
     symp_prob=0.4,
     asymp_prob=0.01,
     start_day=_scenario_a_start_round2,
@@ -315,7 +341,8 @@ test_isolate_a_phase2_case04 = cv.test_prob(
     subtarget=make_subtarget_position(),
 )
 # 境内检测：round4 起低强度持续（温和策略保留，供接触者追踪触发）
-test_isolate_a_phase4_case04 = cv.test_prob(
+test_isolate_a_phase4_case04 = partial(
+    cv.test_prob,
     symp_prob=0.2,
     asymp_prob=0.005,
     start_day=_scenario_a_start_round4,
@@ -323,22 +350,25 @@ test_isolate_a_phase4_case04 = cv.test_prob(
     subtarget=make_subtarget_position(),
 )
 # 境内流动：round4 当日恢复边
-school_close_a_phase2_case04 = SchoolCloseA(
+school_close_a_phase2_case04 = partial(
+    SchoolCloseA,
     start_day=_scenario_a_start_round2,
     end_day=_scenario_a_start_round4,
 )
-community_restrict_a_phase2_case04 = CommunityRestrictA(
+community_restrict_a_phase2_case04 = partial(
+    CommunityRestrictA,
     start_day=_scenario_a_start_round2,
     fraction=0.5,
     end_day=_scenario_a_start_round4,
 )
-work_from_home_a_phase2_case04 = WorkFromHomeA(
+work_from_home_a_phase2_case04 = partial(
+    WorkFromHomeA,
     start_day=_scenario_a_start_round2,
     fraction=0.5,
     end_day=_scenario_a_start_round4,
 )
 
-intervention_scenario_case04 = [
+SCENARIO_SPECS['case04'] = (
     crosser_travel_ml,
     mask_work_school_a_case04,
     mask_community_work_home_case04,
@@ -350,11 +380,12 @@ intervention_scenario_case04 = [
     community_restrict_a_phase2_case04,
     work_from_home_a_phase2_case04,
     vaccinate_a_10k_phase2,
-]
+)
 
 # ================== 场景五：常规 + 升级 + 严控 → round4 起温和策略 ==================
 # 跨境：round3 停止派出，round4 恢复
-crosser_travel_ml_case05 = CrosserTravelMultilayer(
+crosser_travel_ml_case05 = partial(
+    CrosserTravelMultilayer,
     frac_cross_per_day=0.1,
     duration_min=1,
     duration_max=7,
@@ -363,7 +394,8 @@ crosser_travel_ml_case05 = CrosserTravelMultilayer(
     resume_day_outbound=_scenario_a_start_round4,
 )
 # 边境检测：round3 取消，round4 恢复
-test_crosser_legal_phase1_case05 = cv.test_prob(
+test_crosser_legal_phase1_case05 = partial(
+    cv.test_prob,
     symp_prob=0.8,
     asymp_prob=0.1,
     test_delay=1,
@@ -371,7 +403,8 @@ test_crosser_legal_phase1_case05 = cv.test_prob(
     end_day=_scenario_a_start_round3 - 1,
     subtarget=make_subtarget_crosser_exclude_undocumented(crosser_prob=1.0),
 )
-test_crosser_legal_phase2_case05 = cv.test_prob(
+test_crosser_legal_phase2_case05 = partial(
+    cv.test_prob,
     symp_prob=0.8,
     asymp_prob=0.1,
     test_delay=1,
@@ -379,20 +412,23 @@ test_crosser_legal_phase2_case05 = cv.test_prob(
     subtarget=make_subtarget_crosser_exclude_undocumented(crosser_prob=1.0),
 )
 # 口罩：round4 前结束
-mask_work_school_a_case05 = MaskWearingLayerSpecific(
+mask_work_school_a_case05 = partial(
+    MaskWearingLayerSpecific,
     layers=['work', 'school'],
     efficacy=0.5,
     start_day=_scenario_a_start_round1,
     end_day=_scenario_a_start_round4 - 1,
 )
-mask_community_work_home_case05 = MaskWearingLayerSpecific(
+mask_community_work_home_case05 = partial(
+    MaskWearingLayerSpecific,
     layers=['community', 'work', 'home'],
     efficacy=0.5,
     start_day=_scenario_a_start_round2,
     end_day=_scenario_a_start_round4 - 1,
 )
 # 境内检测：round2 至 round3 前、round3 至 round4 前，round4 起低强度持续
-test_isolate_a_phase2_case05 = cv.test_prob(
+test_isolate_a_phase2_case05 = partial(
+    cv.test_prob,
     symp_prob=0.4,
     asymp_prob=0.01,
     start_day=_scenario_a_start_round2,
@@ -400,7 +436,8 @@ test_isolate_a_phase2_case05 = cv.test_prob(
     test_delay=2,
     subtarget=make_subtarget_position(),
 )
-test_isolate_a_phase3_case05 = cv.test_prob(
+test_isolate_a_phase3_case05 = partial(
+    cv.test_prob,
     symp_prob=0.4,
     asymp_prob=0.01,
     start_day=_scenario_a_start_round3,
@@ -409,7 +446,8 @@ test_isolate_a_phase3_case05 = cv.test_prob(
     subtarget=make_subtarget_position(),
 )
 # 境内检测：round4 起低强度持续（温和策略保留，供接触者追踪触发）
-test_isolate_a_phase4_case05 = cv.test_prob(
+test_isolate_a_phase4_case05 = partial(
+    cv.test_prob,
     symp_prob=0.2,
     asymp_prob=0.005,
     start_day=_scenario_a_start_round4,
@@ -417,38 +455,44 @@ test_isolate_a_phase4_case05 = cv.test_prob(
     subtarget=make_subtarget_position(),
 )
 # 接触者追踪：round2 起持续（温和策略保留）
-contact_tracing_phase2_case05 = ContactTracingAOnly(
+contact_tracing_phase2_case05 = partial(
+    ContactTracingAOnly,
     trace_probs=0.4,
     trace_time=2,
     start_day=_scenario_a_start_round2,
 )
 # 境内流动：round4 当日恢复边
-school_close_a_phase2_case05 = SchoolCloseA(
+school_close_a_phase2_case05 = partial(
+    SchoolCloseA,
     start_day=_scenario_a_start_round2,
     end_day=_scenario_a_start_round4,
 )
-community_restrict_a_phase2_case05 = CommunityRestrictA(
+community_restrict_a_phase2_case05 = partial(
+    CommunityRestrictA,
     start_day=_scenario_a_start_round2,
     fraction=0.5,
     end_day=_scenario_a_start_round4,
 )
-community_restrict_a_phase3_case05 = CommunityRestrictA(
+community_restrict_a_phase3_case05 = partial(
+    CommunityRestrictA,
     start_day=_scenario_a_start_round3,
     fraction=0.4,
     end_day=_scenario_a_start_round4,
 )
-work_from_home_a_phase2_case05 = WorkFromHomeA(
+work_from_home_a_phase2_case05 = partial(
+    WorkFromHomeA,
     start_day=_scenario_a_start_round2,
     fraction=0.5,
     end_day=_scenario_a_start_round4,
 )
-work_from_home_a_phase3_case05 = WorkFromHomeA(
+work_from_home_a_phase3_case05 = partial(
+    WorkFromHomeA,
     start_day=_scenario_a_start_round3,
     fraction=0,
     end_day=_scenario_a_start_round4,
 )
 
-intervention_scenario_case05 = [
+SCENARIO_SPECS['case05'] = (
     crosser_travel_ml_case05,
     mask_work_school_a_case05,
     mask_community_work_home_case05,
@@ -466,11 +510,11 @@ intervention_scenario_case05 = [
     vaccinate_a_10k_phase2,
     vaccinate_a_10k_phase3,
     vaccinate_b_5000,
-]
+)
 
 # ================== 场景六：常规 + 升级 + 严控 → round4 温和（无低强度境内检测） ==================
 # 与场景五相同，但 round4 起完全停止境内检测，接触者追踪无新确诊可追踪而失效，用于研究疫情复发
-intervention_scenario_case06 = [
+SCENARIO_SPECS['case06'] = (
     crosser_travel_ml_case05,
     mask_work_school_a_case05,
     mask_community_work_home_case05,
@@ -488,16 +532,17 @@ intervention_scenario_case06 = [
     vaccinate_a_10k_phase2,
     vaccinate_a_10k_phase3,
     vaccinate_b_5000,
-]
+)
 
 # ================== 场景切换 ==================
-interventions = []  # 无干预
-interventions = intervention_scenario_case01  # 场景一：仅常规策略
-# interventions = intervention_scenario_case02  # 场景二：常规 + 升级
-# interventions = intervention_scenario_case03  # 场景三：常规 + 升级 + 严控
-# interventions = intervention_scenario_case04  # 场景四：常规 + 升级 → round4 温和
-# interventions = intervention_scenario_case05  # 场景五：常规 + 升级 + 严控 → round4 温和（含低强度检测）
-# interventions = intervention_scenario_case06  # 场景六：常规 + 升级 + 严控 → round4 温和（无境内检测，研究复发）
+# scenario_name = 'baseline'  # 无干预
+scenario_name = 'case01'  # 场景一：仅常规策略
+# scenario_name = 'case02'  # 场景二：常规 + 升级
+# scenario_name = 'case03'  # 场景三：常规 + 升级 + 严控
+# scenario_name = 'case04'  # 场景四：常规 + 升级 → round4 温和
+# scenario_name = 'case05'  # 场景五：常规 + 升级 + 严控 → round4 温和（含低强度检测）
+# scenario_name = 'case06'  # 场景六：常规 + 升级 + 严控 → round4 温和（无境内检测，研究复发）
+interventions = get_scenario(scenario_name)
 
 # ================== 6. 运行模拟 ==================
 sim = cv.Sim(
@@ -512,18 +557,9 @@ sim.initialize()
 sim.run()
 
 # ================== 7. 保存与绘图 ==================
-_scenario_name = (
-    'case06' if interventions == intervention_scenario_case06
-    else 'case05' if interventions == intervention_scenario_case05
-    else 'case04' if interventions == intervention_scenario_case04
-    else 'case03' if interventions == intervention_scenario_case03
-    else 'case02' if interventions == intervention_scenario_case02
-    else 'case01' if interventions == intervention_scenario_case01
-    else 'baseline'
-)
-results_dir = os.path.join('myproject', 'results', '多层耦合网络图片', _scenario_name)
+results_dir = os.path.join('myproject', 'results', '多层耦合网络图片', scenario_name)
 os.makedirs(results_dir, exist_ok=True)
-sim_basename = _scenario_name
+sim_basename = scenario_name
 sim_path = os.path.join(results_dir, sim_basename + '.sim')
 sim.save(filename=sim_path, keep_people=True)
 
@@ -3,16 +3,12 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
-import matplotlib
 import matplotlib.pyplot as plt
-import networkx as nx
 import ContactNetwork
 import CrossNetwork
 import MyPlot
 
-# 设置 matplotlib 显示中文（Windows 常用 SimHei / 微软雅黑）
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示为方框
+MyPlot.setup_chinese_font()
 
 # 定义层级配置
 custom_config={
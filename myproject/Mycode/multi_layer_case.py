@@ -9,6 +9,7 @@
   - 创建四层区内网络（home/school/work/community），A/B 两区各自独立
   - 添加基于出行目的的跨区层（cross_work/cross_community/cross_home）
   - 候鸟跨境移动：出境时原属地权重冻结，跨区层按 purpose 激活
+  - 人口只创建一次，以 MultiSim 并行运行「无居家办公」(case00) 与「A 区居家办公」(case01) 两种方案
 
 验证：
   运行结束后自动输出各层边数统计，用于确认：
@@ -24,14 +25,14 @@ if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 import numpy as np
+import numba as nb
+from functools import partial
 import covasim as cv
-import covasim.utils as cvu
 import Enums
 import sciris as sc
-import os
 import matplotlib
-import matplotlib.pyplot as plt
-import networkx as nx
+# 图片只保存为 PNG，不需要 GUI 后端；须在 MyPlot 导入 pyplot 之前设定
+matplotlib.use('Agg')
 import ContactNetwork
 import CrossNetwork
 import MyPlot
@@ -60,9 +61,26 @@ from my_utils import (
     make_subtarget_crosser_exclude_undocumented,
 )
 
-# 设置 matplotlib 显示中文（Windows 常用 SimHei / 微软雅黑）
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示为方框
+MyPlot.setup_chinese_font()
+
+# 边数少于该阈值时 Numba 的调用开销不划算，边分类走 NumPy 路径
+NUMBA_MIN_EDGES = 5000
+
+
+@nb.njit(cache=True)
+def classify_edges(p1, p2, lid, n_layers, is_A):
+    '''单次遍历拼接后的边表，按层 id 返回 (n_layers, 2) 的 [A 区内, 跨区] 边数，不分配临时布尔数组。
+    A/B 两区构成全体人口的划分，B 区内边数 = 总边数 - A 区内 - 跨区，无需单独统计。'''
+    counts = np.zeros((n_layers, 2), dtype=np.int64)
+    for i in range(p1.shape[0]):
+        a1 = is_A[p1[i]]
+        a2 = is_A[p2[i]]
+        if a1 != a2:
+            counts[lid[i], 1] += 1
+        elif a1:
+            counts[lid[i], 0] += 1
+    return counts
+
 
 # ================== 1. 网络层配置 ==================
 custom_config={
@@ -100,25 +118,41 @@ countries_config = {
 seed_population = 0      # 人口与区内接触网（create_custom_population）
 seed_cross_layer = 42    # 跨区层（流动者选取与跨区边）
 
-# 创建自定义人口（pop_size 须与下方 custom_pars['pop_size'] 一致）
+# 人口规模（custom_pars['pop_size'] 同取此值）
 pop_size = 30000
-popdict_base, custom_keys = ContactNetwork.create_custom_population(
-    pop_size, custom_config, countries_config, seed=seed_population
-)
-# 添加多层跨境层（基于出行目的的精准嵌入）
-popdict_base = CrossNetwork.add_cross_layer_multilayer(
-    popdict_base,
+
+
+# 跨区层配置（add_cross_layer_multilayer 参数，基于出行目的的精准嵌入）
+cross_layer_config = dict(
     frac_travelers=0.01,
     n_cross_per_person=10,
     cross_beta=0.6,
     frac_work=0.7,
     frac_visit=0.25,
     frac_undocumented=0.05,
-    cross_layer_seed=seed_cross_layer,
     region_a='A',
     region_b='B',
 )
 
+def build_pop():
+    '''
+    创建四层区内网络并添加多层跨境层，返回 popdict_base。
+
+    结果按 (pop_size, 随机种子, 网络配置) 缓存到 myproject/cache（ContactNetwork.load_or_build_popdict），
+    重复运行时直接读取，不再重建网络；修改任一网络配置会得到新的缓存文件。
+    '''
+    def build():
+        popdict_base, custom_keys = ContactNetwork.create_custom_population(
+            pop_size, custom_config, countries_config, seed=seed_population
+        )
+        return CrossNetwork.add_cross_layer_multilayer(
+            popdict_base, cross_layer_seed=seed_cross_layer, **cross_layer_config
+        )
+
+    key = [pop_size, seed_population, seed_cross_layer, custom_config, countries_config, cross_layer_config]
+    return ContactNetwork.load_or_build_popdict(build, key)
+
+
 # ================== 3. 仿真参数与干预 ==================
 custom_pars = {
     # Population parameters
@@ -141,44 +175,117 @@ custom_pars = {
     'beta': 0.036,
 }
 
+# 干预以工厂形式定义，每次 run 新建实例，避免两次模拟共享干预内部状态
 # 多层跨境移动（每日 10% 候鸟出境，停留 1~7 天）
-crosser_travel_ml = CrosserTravelMultilayer(
+crosser_travel_ml = partial(
+    CrosserTravelMultilayer,
     frac_cross_per_day=0.1,
     duration_min=1,
     duration_max=7,
     start_day=0,
 )
-# A 区居家办公（工作层移除 70% 边）+ 社区限制（社区层移除 50% 边），须在 CrosserTravelMultilayer 之后
-interventions = [
-    crosser_travel_ml,
-    WorkFromHomeA(start_day=0, fraction=0.3),
-    # CommunityRestrictA(start_day=0, fraction=0.5),
-]
+# A 区居家办公（工作层移除 30% 边）
+work_from_home_a = partial(WorkFromHomeA, start_day=0, fraction=0.3)
+
+results_dir = r'myproject\results\多层耦合网络图片\居家办公干预'
+
 
 # ================== 4. 运行模拟 ==================
-sim = cv.Sim(
-    pars=custom_pars,
-    label='多层网络模拟',
-    interventions=interventions,
-    analyzers=[MyPlot.CountryRegionAnalyzer(country_key='country', regions=('A', 'B'))],
-)
-sim.popdict = popdict_base
-sim.reset_layer_pars(force=True)
-sim.initialize()
-sim.run()
+def make_sim(interventions, label):
+    '''以 popdict_base 的深拷贝创建一次模拟（干预与跨区层 beta 会就地修改网络）；不在此初始化，由 MultiSim 在子进程中完成。'''
+    sim = cv.Sim(
+        pars=custom_pars,
+        label=label,
+        interventions=interventions,
+        analyzers=[MyPlot.CountryRegionAnalyzer(country_key='country', regions=('A', 'B'))],
+    )
+    sim.popdict = sc.dcp(popdict_base)
+    sim.reset_layer_pars(force=True)
+    return sim
 
-results_dir = r'myproject\results\多层耦合网络图片\居家办公干预'
-os.makedirs(results_dir, exist_ok=True)
-sim_basename = 'case01'
-sim_path = os.path.join(results_dir, sim_basename + '.sim')
-sim.save(filename=sim_path, keep_people=True)  # 保留 people 与 infection_log，供 plot_case 等后续绘图使用
-
-# 各层每日新感染人数（按区域、按传播层）
-MyPlot.plot_layer_region_infections(
-    sim,
-    country_key='country',
-    regions=('A', 'B'),
-    layers=['home', 'school', 'work', 'community'],
-    show_regions=('A'),
-    save_path=os.path.join(results_dir, sim_basename + '.png'),
-)
+
+def save_and_plot(sim, sim_basename):
+    '''保存 .sim 并绘制各层感染曲线。'''
+    os.makedirs(results_dir, exist_ok=True)
+    sim_path = os.path.join(results_dir, sim_basename + '.sim')
+    sim.save(filename=sim_path, keep_people=True)  # 保留 people 与 infection_log，供 plot_case 等后续绘图使用
+
+    # 各层每日新感染人数（按区域、按传播层）
+    MyPlot.plot_layer_region_infections(
+        sim,
+        country_key='country',
+        regions=('A', 'B'),
+        layers=['home', 'school', 'work', 'community'],
+        show_regions=('A'),
+        save_path=os.path.join(results_dir, sim_basename + '.png'),
+    )
+
+
+# ================== 5. 验证：各层边数统计 ==================
+def print_layer_stats(sim):
+    '''输出各层边数统计（区内层应无跨区边，跨区层应仅含跨区边）及候鸟按目的的人数。'''
+    # 按 country_code（int8，建人口时生成）建立 A 区成员查找表（按人员 id 直接索引），每条边只需两次 gather，无需 np.isin；
+    # 全体人口只分 A/B 两区，非 A 即 B，因此一张表即可区分三类边
+    people = sim.people
+    assert sorted(countries_config) == ['A', 'B'], '边分类假定人口只分 A、B 两区'
+    is_A = np.asarray(people.country_code) == list(countries_config).index('A')
+    assert len(people) < 2**31, '人员 id 须能以 int32 表示'
+
+    lkeys = [lkey for lkey in ['home', 'school', 'work', 'community', 'cross_work', 'cross_community', 'cross_home']
+             if lkey in people.contacts]
+    layers = [people.contacts[lkey] for lkey in lkeys]
+    lens = [len(layer) for layer in layers]
+    # 将各层 p1/p2 拼接后一次性分类；按 int32 读取边端点以减半 gather 的索引带宽（默认 32 位精度下 p1/p2 已是 int32）；
+    # 不回写 people.contacts，64 位精度下 covasim 的 Numba 内核要求 int64
+    all_p1 = np.concatenate([layer['p1'] for layer in layers]).astype(np.int32, copy=False)
+    all_p2 = np.concatenate([layer['p2'] for layer in layers]).astype(np.int32, copy=False)
+    lid = np.repeat(np.arange(len(lkeys)), lens)
+    if len(all_p1) >= NUMBA_MIN_EDGES:
+        counts = classify_edges(all_p1, all_p2, lid, len(lkeys), is_A)
+    else:
+        a1, a2 = is_A[all_p1], is_A[all_p2]
+        counts = np.stack([
+            np.bincount(lid, weights=mask, minlength=len(lkeys))
+            for mask in (a1 & a2, a1 ^ a2)
+        ], axis=1).astype(np.int64)
+    # 一次转为 Python int；B 区内边数由总数相减得到，不再单独统计
+    stats = []
+    for lkey, n_total, (n_A, n_cross) in zip(lkeys, lens, counts.tolist()):
+        stats.append((lkey, n_total, n_A, n_total - n_A - n_cross, n_cross))
+
+    print(f'===== {sim.label} =====')
+    print('--- 区内层（应无跨区边） ---')
+    for lkey, n_total, n_A, n_B, n_cross in stats:
+        if lkey.startswith('cross_'):
+            continue
+        print(f'  {lkey}: 总边数={n_total}, A区内={n_A}, B区内={n_B}, 跨区={n_cross}')
+
+    print('--- 跨区层（应仅含跨区边） ---')
+    for lkey, n_total, n_A, n_B, n_cross in stats:
+        if not lkey.startswith('cross_'):
+            continue
+        print(f'  {lkey}: 总边数={n_total}, A区内={n_A}, B区内={n_B}, 跨区={n_cross}')
+
+    print('--- 候鸟统计 ---')
+    crosser = np.asarray(people.crosser, dtype=bool)
+    n_work, n_visit, n_undoc = np.bincount(people.crosser_purpose_code[crosser], minlength=3)
+    print(f'  候鸟总数={crosser.sum()}, 务工={n_work}, 探亲={n_visit}, 偷渡={n_undoc}')
+
+
+# ================== 6. 主流程：人口只建一次，两种干预方案并行运行 ==================
+# 须置于 __main__ 保护下：Windows 上多进程以 spawn 方式启动，子进程会重新导入本模块
+if __name__ == '__main__':
+    popdict_base = build_pop()
+    sim_basenames = ['case00', 'case01']
+    sims = [
+        # 无居家办公（仅候鸟跨境移动）
+        make_sim([crosser_travel_ml()], label='多层网络模拟（无居家办公）'),
+        # A 区居家办公，须在 CrosserTravelMultilayer 之后
+        make_sim([crosser_travel_ml(), work_from_home_a()], label='多层网络模拟（A区居家办公）'),
+    ]
+    msim = cv.MultiSim(sims)
+    msim.run(n_cpus=len(sims), keep_people=True)  # 保留 people，供保存、绘图与边数统计使用
+
+    for sim, sim_basename in zip(msim.sims, sim_basenames):
+        save_and_plot(sim, sim_basename)
+        print_layer_stats(sim)
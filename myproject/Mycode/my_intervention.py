@@ -1,7 +1,10 @@
 # 政策/干预类：从 compose_intervention 迁移，供组合情景复用
 import numpy as np
+import numba as nb
 import covasim as cv
 import covasim.defaults as cvd
+from CrossNetwork import PURPOSE_WORK, PURPOSE_VISIT, PURPOSE_NONE, PURPOSE_NAMES
+from my_utils import in_region_mask, abroad_mask, region_codes, region_code, move_to, moved_since, register_sim
 
 
 # 默认区域键与名称（与 compose_intervention 中 _region_key / _region_name_a|b 一致）
@@ -9,6 +12,193 @@ _region_key = 'position'
 _region_name_a = 'A'
 _region_name_b = 'B'
 
+# CrosserTravel* 的 _return_day（int32 回国日）中表示「在境内、无待回国日期」的哨兵值
+_AT_HOME = -1
+
+
+@nb.njit(parallel=cv.utils.safe_parallel, cache=cv.utils.cache)
+def _set_edge_beta(p1, p2, is_abroad, beta, val_abroad, val_home):
+    '''任一端在境外的边 beta 设为 val_abroad，其余设为 val_home；单次遍历原地写入，不生成临时布尔数组。'''
+    for i in nb.prange(len(p1)):
+        if is_abroad[p1[i]] or is_abroad[p2[i]]:
+            beta[i] = val_abroad
+        else:
+            beta[i] = val_home
+
+
+@nb.njit(parallel=cv.utils.safe_parallel, cache=cv.utils.cache)
+def _edge_either_packed(packed, p1, p2, out):
+    '''out[i] = 边 i 任一端的位为 1；packed 为 np.packbits(mask, bitorder='little') 的位数组（每人 1 bit），
+    随机 gather 只访问 1/8 大小的数组，单次遍历写入，不生成临时数组。'''
+    for i in nb.prange(len(p1)):
+        a = p1[i]
+        b = p2[i]
+        out[i] = ((packed[a >> 3] >> (a & 7)) | (packed[b >> 3] >> (b & 7))) & 1 == 1
+
+
+@nb.njit(cache=True)
+def _sample_without_replacement(inds, k):
+    '''从 inds 中无放回随机抽取 k 个：k 远小于 len(inds) 时用 Floyd 算法（只抽 k 次随机数，不复制 inds，
+    结果顺序不保证随机）；否则对副本只做前 k 步 Fisher–Yates 交换，而非整体置换。
+    使用 Numba 的随机数流（cv.utils.set_seed 同时为其设种子），不修改传入的 inds。'''
+    n = len(inds)
+    if k * 4 < n:
+        chosen = set()
+        out = np.empty(k, dtype=inds.dtype)
+        m = 0
+        for j in range(n - k, n):
+            r = np.random.randint(0, j + 1)
+            if r in chosen:
+                r = j
+            chosen.add(r)
+            out[m] = inds[r]
+            m += 1
+        return out
+    pool = inds.copy()
+    for i in range(k):
+        j = np.random.randint(i, n)
+        pool[i], pool[j] = pool[j], pool[i]
+    return pool[:k].copy()
+
+
+@nb.njit(cache=True)
+def _sample_from_mask(mask, k, n_true, out):
+    '''从布尔数组 mask 的 n_true 个 True 位置中无放回随机抽取 k 个下标（选择抽样，单次遍历，按下标升序返回），
+    无需先用 np.where 生成全部候选下标。结果写入预分配缓冲区 out（长度 >= k），返回其前 k 个元素的视图。
+    使用 Numba 的随机数流。'''
+    filled = 0
+    remaining = n_true
+    for i in range(len(mask)):
+        if filled == k:
+            break
+        if mask[i]:
+            if np.random.random() * remaining < k - filled:
+                out[filled] = i
+                filled += 1
+            remaining -= 1
+    return out[:k]
+
+
+@nb.njit(cache=True)
+def _find_returning(crosser, return_day, t, quarantined, isolated, out):
+    '''单次遍历找出当日到期回国的候鸟（未被隔离），下标写入预分配缓冲区 out（长度 >= len(crosser)），
+    返回其前 n 个元素的视图；不生成中间布尔数组。'''
+    n = 0
+    for i in range(len(crosser)):
+        if crosser[i] and return_day[i] == t and not quarantined[i] and not isolated[i]:
+            out[n] = i
+            n += 1
+    return out[:n]
+
+
+@nb.njit(parallel=cv.utils.safe_parallel, cache=cv.utils.cache)
+def _compute_at_home(crosser, return_day, quarantined, isolated, out):
+    '''out[i] = 在境内且未被隔离的候鸟，单次遍历写入预分配数组，返回 True 的个数。'''
+    n_true = 0
+    for i in nb.prange(len(crosser)):
+        v = crosser[i] and return_day[i] == _AT_HOME and not quarantined[i] and not isolated[i]
+        out[i] = v
+        if v:
+            n_true += 1
+    return n_true
+
+
+def _choose_edges(rng, inds_all, n_remove):
+    '''从候选边 inds_all 中随机选出 n_remove 条待移除的边（rng 为 np.random.Generator 或 np.random 模块）。
+    rng 为 np.random 时一律用 Numba 无放回抽样，只做 n_remove 次抽取（Floyd / 部分 Fisher–Yates），不整体打乱；
+    为 Generator 时移除不足一半用其 choice，否则打乱后取前 n_remove 个。'''
+    if not isinstance(rng, np.random.Generator):
+        return _sample_without_replacement(inds_all, n_remove)
+    if n_remove * 2 < len(inds_all):
+        return inds_all[rng.choice(len(inds_all), n_remove, replace=False)]
+    rng.shuffle(inds_all)
+    return inds_all[:n_remove]
+
+
+def _has_attrs(intv, people, *keys):
+    '''按 People 对象缓存人口是否具备 keys 中各属性（非 None），人口不变时 apply 不再逐日 getattr。'''
+    if getattr(intv, '_attrs_people', None) is not people:
+        intv._attrs_ok = all(getattr(people, key, None) is not None for key in keys)
+        intv._attrs_people = people
+    return intv._attrs_ok
+
+
+def _crosser_view(intv, people):
+    '''CrosserTravel* 用：按 People 对象缓存 crosser 布尔数组，人口不变时 apply 不再逐日 getattr / np.asarray；
+    人口缺少所在地、country 或 crosser 属性时返回 None。'''
+    if intv._views_people is not people:
+        has_attrs = _has_attrs(intv, people, intv.region_key, 'country', 'crosser')
+        intv._crosser = np.asarray(people.crosser, dtype=bool) if has_attrs else None
+        intv._views_people = people
+    return intv._crosser
+
+
+def _scratch(store, lkey, n, k):
+    '''取 store[lkey] 中 k 个长度为 n 的布尔暂存数组，跨日复用；边数变化（pop_inds / append 后）时重新分配。'''
+    bufs = store.get(lkey)
+    if bufs is None or len(bufs[0]) != n:
+        bufs = store[lkey] = [np.empty(n, dtype=bool) for _ in range(k)]
+    return bufs
+
+
+def _edge_either(mask, p1, p2, out, tmp):
+    '''out = mask[p1] | mask[p2]，gather 结果直接写入预分配数组（mode='clip' 避免 take 的输出缓冲）。'''
+    np.take(mask, p1, out=out, mode='clip')
+    np.take(mask, p2, out=tmp, mode='clip')
+    return np.bitwise_or(out, tmp, out=out)
+
+
+def _region_edge_inds(layer, in_a):
+    '''一端在区域内（in_a 为 True）的边下标：in_a 先压成位数组，直接在 layer 的 p1/p2 上按位 gather，不复制边数组。'''
+    p1, p2 = layer['p1'], layer['p2']
+    edge_in_a = np.empty(len(p1), dtype=bool)
+    _edge_either_packed(np.packbits(in_a, bitorder='little'), p1, p2, edge_in_a)
+    return np.flatnonzero(edge_in_a)
+
+
+def _domestic_edges_in(store, lkey, p1, p2, in_a, is_abroad):
+    '''涉及指定区域且两端均未跨境的边（edge_in_a & ~edge_abroad），结果为 store 中的暂存数组，仅当次使用。'''
+    edge_in_a, edge_abroad, tmp = _scratch(store, lkey, len(p1), 3)
+    _edge_either(in_a, p1, p2, edge_in_a, tmp)
+    _edge_either(is_abroad, p1, p2, edge_abroad, tmp)
+    np.invert(edge_abroad, out=edge_abroad)
+    return np.bitwise_and(edge_in_a, edge_abroad, out=edge_in_a)
+
+
+def _incident_edges(p1, p2, n):
+    '''人员→相邻边的 CSR (indptr, edge_ids)：edge_ids[indptr[i]:indptr[i+1]] 为以 i 为一端的边下标。'''
+    ends = np.concatenate([p1, p2])
+    edge_ids = np.argsort(ends, kind='stable') % len(p1)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=n), out=indptr[1:])
+    return indptr, edge_ids
+
+
+@nb.njit(cache=True)
+def _gather_edges(indptr, edge_ids, agents):
+    '''按 CSR 收集 agents 的全部相邻边下标（两端均在 agents 中的边会重复出现）。'''
+    total = 0
+    for a in agents:
+        total += indptr[a + 1] - indptr[a]
+    out = np.empty(total, dtype=edge_ids.dtype)
+    k = 0
+    for a in agents:
+        for j in range(indptr[a], indptr[a + 1]):
+            out[k] = edge_ids[j]
+            k += 1
+    return out
+
+
+def _edges_touching(store, lkey, layer, n, agents):
+    '''agents 的全部相邻边下标（可能重复）。store[lkey] 缓存该层的人员→边 CSR，
+    只需 O(|agents|·平均度) 而非扫描全部边；层的 p1/p2 数组被替换（pop_inds / append）后重建。'''
+    p1, p2 = layer['p1'], layer['p2']
+    cached = store.get(lkey)
+    if cached is None or cached[0] is not p1 or cached[1] is not p2:
+        cached = store[lkey] = (p1, p2, _incident_edges(p1, p2, n))
+    indptr, edge_ids = cached[2]
+    return _gather_edges(indptr, edge_ids, agents)
+
 
 # ========== 1. 接触者追踪：仅追踪指定区域 ==========
 class ContactTracingAOnly(cv.contact_tracing):
@@ -20,18 +210,18 @@ class ContactTracingAOnly(cv.contact_tracing):
 
     def notify_contacts(self, sim, contacts):
         '''只通知 A 区的接触者'''
-        is_dead = np.where(sim.people.dead)[0]  # 已死亡人员的索引
-        position = getattr(sim.people, self.region_key, None)
-        if position is None:
+        if not _has_attrs(self, sim.people, self.region_key):
             # 如果没有 position 属性，回退到原始行为
             super().notify_contacts(sim, contacts)
             return
 
-        is_in_a = (np.asarray(position) == self.region_name)
+        dead = sim.people.dead
+        is_in_a = in_region_mask(sim, self.region_key, self.region_name)
         for trace_time, contact_inds in contacts.items():
-            contact_inds = np.setdiff1d(contact_inds, is_dead)  # 排除已死亡人员
-            # 只通知 A 区的接触者
-            contact_inds_a = contact_inds[is_in_a[contact_inds]]
+            # 只通知存活的 A 区接触者：按人员查表过滤，不再对死亡名单做 setdiff1d；
+            # 同一人可能经多层被追踪到，np.unique 去重（仅对过滤后的少量索引排序）
+            keep = ~dead[contact_inds] & is_in_a[contact_inds]
+            contact_inds_a = np.unique(contact_inds[keep])
             if len(contact_inds_a) > 0:
                 sim.people.known_contact[contact_inds_a] = True
                 sim.people.date_known_contact[contact_inds_a] = np.fmin(
@@ -67,22 +257,18 @@ class reduce_region_a_contacts(cv.Intervention):
             return
         if 'base' not in sim.people.contacts:
             return
-        region = getattr(sim.people, self.region_key, None)
-        if region is None:
+        if not _has_attrs(self, sim.people, self.region_key):
             return
-        in_a = (region == self.region_name)
+        in_a = in_region_mask(sim, self.region_key, self.region_name)
         layer = sim.people.contacts['base']
-        p1, p2 = layer['p1'][:], layer['p2'][:]
-        edge_in_a = in_a[p1] | in_a[p2]
-        n_total = edge_in_a.sum()
+        inds_all = _region_edge_inds(layer, in_a)
+        n_total = len(inds_all)
         if n_total == 0:
             return
         n_remove = int(n_total * (1 - self.fraction))
         if n_remove <= 0:
             return
-        inds_all = np.where(edge_in_a)[0]
-        np.random.shuffle(inds_all)
-        to_remove = inds_all[:n_remove]
+        to_remove = _choose_edges(np.random, inds_all, n_remove)
         self._stored_contacts = layer.pop_inds(to_remove)
         self._applied = True
 
@@ -96,33 +282,28 @@ class ScaleRegionBaseBetaByPhase(cv.Intervention):
         self.region_key = region_key if region_key is not None else _region_key
         self.region_name = region_name if region_name is not None else _region_name_a
         self.day_scale_pairs = sorted(day_scale_pairs or [(0, 1.0)], key=lambda x: x[0])
+        self._scale_table = None
+        self._scratch = {}
 
-    def _scale_for_day(self, t):
-        s = 1.0
-        for day_start, scale in self.day_scale_pairs:
-            if t >= day_start:
-                s = scale
-        return cvd.default_float(s)
+    def initialize(self, sim):
+        super().initialize()
+        # 逐日系数表：第 t 日取起始日 <= t 的最后一段的系数，首段之前为 1.0
+        day_starts = np.array([sim.day(day_start) for day_start, _ in self.day_scale_pairs])
+        scales = np.array([1.0] + [scale for _, scale in self.day_scale_pairs], dtype=cvd.default_float)
+        self._scale_table = scales[np.searchsorted(day_starts, np.arange(sim.npts), side='right')]
 
     def apply(self, sim):
         if 'base' not in sim.people.contacts:
             return
         people = sim.people
-        position = getattr(people, self.region_key, None)
-        country = getattr(people, 'country', None)
-        if position is None:
+        if not _has_attrs(self, people, self.region_key, 'country'):
             return
-        t = sim.t
-        scale = self._scale_for_day(t)
-        in_a = (np.asarray(position) == self.region_name)
-        is_abroad = (np.asarray(position) != np.asarray(country))
+        scale = self._scale_table[sim.t]
+        in_a = in_region_mask(sim, self.region_key, self.region_name)
+        is_abroad = abroad_mask(sim, self.region_key)
         layer = people.contacts['base']
-        p1, p2 = layer['p1'], layer['p2']
-        beta = layer['beta']
-        edge_in_a = in_a[p1] | in_a[p2]
-        edge_abroad = is_abroad[p1] | is_abroad[p2]
-        domestic_in_a = edge_in_a & ~edge_abroad
-        beta[domestic_in_a] = scale
+        domestic_in_a = _domestic_edges_in(self._scratch, 'base', layer['p1'], layer['p2'], in_a, is_abroad)
+        layer['beta'][domestic_in_a] = scale
 
 
 # ========== 3. 候鸟动态跨境 ==========
@@ -140,6 +321,7 @@ class CrosserTravel(cv.Intervention):
         region_key=None,
         region_name_a=None,
         region_name_b=None,
+        seed=None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -151,8 +333,15 @@ class CrosserTravel(cv.Intervention):
         self.region_key = region_key if region_key is not None else _region_key
         self.region_name_a = region_name_a if region_name_a is not None else _region_name_a
         self.region_name_b = region_name_b if region_name_b is not None else _region_name_b
+        self.seed = seed
+        self._randint = None
         self._return_day = None
+        self._at_home = None
+        self._returning_buf = None
+        self._go_buf = None
         self._cross_beta = None
+        self._views_people = None
+        self._crosser = None
 
     def initialize(self, sim):
         super().initialize()
@@ -160,8 +349,17 @@ class CrosserTravel(cv.Intervention):
         if self.end_day_outbound is not None:
             self.end_day_outbound = sim.day(self.end_day_outbound)
         n = sim.n
-        self._return_day = np.full(n, np.nan, dtype=float)
-        self._cross_beta = float(sim['beta_layer'].get('cross', 1.0))
+        self._return_day = np.full(n, _AT_HOME, dtype=np.int32)  # 回国日；_AT_HOME 表示在境内
+        self._at_home = np.empty(n, dtype=bool)  # 每日可出境候鸟掩码的复用缓冲区
+        # 每日回国 / 出境人员下标的复用缓冲区（move_to 会复制下标，缓冲区次日可直接覆盖）
+        self._returning_buf = np.empty(n, dtype=np.int64)
+        self._go_buf = np.empty(n, dtype=np.int64)
+        # 境外停留天数的抽样函数：指定 seed 时使用独立随机数流（只建一次），否则沿用 covasim 已设种子的全局流
+        self._randint = np.random.default_rng(self.seed).integers if self.seed is not None else np.random.randint
+        # 每日写入 beta 的常量，按 Covasim 默认浮点类型预先转换一次
+        self._cross_beta = cvd.default_float(sim['beta_layer'].get('cross', 1.0))
+        self._f0 = cvd.default_float(0.0)
+        self._f1 = cvd.default_float(1.0)
         # 确保 base 层有 beta 数组（与 p1 等长），使用 Covasim 的默认浮点类型
         if 'base' in sim.people.contacts:
             layer = sim.people.contacts['base']
@@ -171,51 +369,43 @@ class CrosserTravel(cv.Intervention):
     def apply(self, sim):
         t = sim.t
         people = sim.people
-        position = getattr(people, self.region_key, None)
-        country = getattr(people, 'country', None)
-        crosser = getattr(people, 'crosser', None)
-        if position is None or country is None or crosser is None:
+        crosser = _crosser_view(self, people)
+        if crosser is None:
             return
         return_day = self._return_day
+        country_code = region_codes(sim, self.region_key)[1]
 
         # 1) 到期者回国（排除被隔离人员：quarantined 或 isolated 状态不能移动）
-        returning = crosser & (return_day == t) & ~people.quarantined & ~people.isolated
-        if np.any(returning):
-            position[returning] = country[returning]
-            return_day[returning] = np.nan
+        returning = _find_returning(crosser, return_day, t, people.quarantined, people.isolated, self._returning_buf)
+        if len(returning):
+            move_to(sim, returning, country_code[returning], self.region_key)
+            return_day[returning] = _AT_HOME
 
         # 2) 从境内候鸟中按比例随机选人出境（仅从 start_day 开始；end_day_outbound 之后不再派出）
         if t >= self.start_day and (self.end_day_outbound is None or t < self.end_day_outbound):
-            at_home = crosser & np.isnan(return_day) & ~people.quarantined & ~people.isolated
-            n_at_home = np.count_nonzero(at_home)
+            at_home = self._at_home
+            n_at_home = _compute_at_home(crosser, return_day, people.quarantined, people.isolated, at_home)
             if n_at_home > 0 and self.frac_cross_per_day > 0:
                 n_go = max(0, int(n_at_home * self.frac_cross_per_day + 0.5))
                 n_go = min(n_go, n_at_home)
                 if n_go > 0:
-                    at_home_inds = np.where(at_home)[0]
-                    go_inds = np.random.choice(at_home_inds, size=n_go, replace=False)
-                    dur = np.random.randint(self.duration_min, self.duration_max + 1, size=len(go_inds))
+                    go_inds = _sample_from_mask(at_home, n_go, n_at_home, self._go_buf)
+                    dur = self._randint(self.duration_min, self.duration_max + 1, size=len(go_inds))
                     return_day[go_inds] = t + dur
                     # 对方区域：A -> B, B -> A
-                    from_a = (np.asarray(country[go_inds]) == self.region_name_a)
-                    position[go_inds] = np.where(from_a, self.region_name_b, self.region_name_a)
+                    # 两区互换：目的地编码 = code_a + code_b - 户籍地编码（候鸟户籍地只会是 A 或 B）
+                    code_a = region_code(sim, self.region_name_a, self.region_key)
+                    code_b = region_code(sim, self.region_name_b, self.region_key)
+                    move_to(sim, go_inds, code_a + code_b - country_code[go_inds], self.region_key)
 
-        # 3) 按 position 重算 base/cross 层 per-edge beta
-        is_abroad = (np.asarray(position) != np.asarray(country))
+        # 3) 按 position 重算 base/cross 层 per-edge beta（move_to 已使当日区域缓存失效）
+        is_abroad = abroad_mask(sim, self.region_key)
         if 'base' in people.contacts:
             layer = people.contacts['base']
-            p1, p2 = layer['p1'], layer['p2']
-            beta = layer['beta']
-            edge_abroad = is_abroad[p1] | is_abroad[p2]
-            beta[edge_abroad] = cvd.default_float(0.0)
-            beta[~edge_abroad] = cvd.default_float(1.0)
+            _set_edge_beta(layer['p1'], layer['p2'], is_abroad, layer['beta'], self._f0, self._f1)
         if 'cross' in people.contacts:
             layer = people.contacts['cross']
-            p1, p2 = layer['p1'], layer['p2']
-            beta = layer['beta']
-            edge_abroad = is_abroad[p1] | is_abroad[p2]
-            beta[edge_abroad] = cvd.default_float(self._cross_beta)
-            beta[~edge_abroad] = cvd.default_float(0.0)
+            _set_edge_beta(layer['p1'], layer['p2'], is_abroad, layer['beta'], self._cross_beta, self._f0)
 
 
 # ========== 3b. 候鸟动态跨境（多层网络专用） ==========
@@ -225,7 +415,7 @@ class CrosserTravelMultilayer(cv.Intervention):
     务工：cross_work+cross_community；探亲：cross_home+cross_community；偷渡：仅 cross_community。
 
     使用前提：
-      - popdict 须由 CrossNetwork.add_cross_layer_multilayer 生成，含 crosser、crosser_purpose、position、country
+      - popdict 须由 CrossNetwork.add_cross_layer_multilayer 生成，含 crosser、crosser_purpose(_code)、position、country
       - beta_layer 须包含 cross_work、cross_community、cross_home（如 0.6）
 
     参数：
@@ -236,6 +426,10 @@ class CrosserTravelMultilayer(cv.Intervention):
       resume_day_outbound: 恢复新出境的仿真日，若设且 t>=resume 则忽略 end_day_outbound 恢复派出（用于严控→温和）
       region_key: 位置属性名，默认 'position'
       region_name_a, region_name_b: 两区名称，默认 'A'、'B'
+      seed: 境外停留天数的独立随机种子，None 表示沿用 covasim 的全局随机数流
+
+    区内层按边记录本干预置 0 的边（任一端在境外）：首次或边数组被替换时全量写 0 / 1，
+    此后只改写移动人员相邻边中 abroad 状态翻转的边（出境置 0、回国恢复 1.0），其余边的 beta 不动。
 
     示例：
       from my_intervention import CrosserTravelMultilayer
@@ -243,6 +437,9 @@ class CrosserTravelMultilayer(cv.Intervention):
       cv.Sim(pars={'beta_layer': {..., 'cross_work': 0.6, 'cross_community': 0.6, 'cross_home': 0.6}},
              interventions=[CrosserTravelMultilayer(frac_cross_per_day=0.1, duration_min=1, duration_max=7)])
     '''
+    # 跨区层对 crosser 出行目的的要求（cross_community 不限目的）
+    _REQUIRED_PURPOSE = {'cross_work': PURPOSE_WORK, 'cross_home': PURPOSE_VISIT}
+
     def __init__(
         self,
         frac_cross_per_day=0.1,
@@ -254,6 +451,7 @@ class CrosserTravelMultilayer(cv.Intervention):
         region_key=None,
         region_name_a=None,
         region_name_b=None,
+        seed=None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -266,8 +464,21 @@ class CrosserTravelMultilayer(cv.Intervention):
         self.region_key = region_key if region_key is not None else _region_key
         self.region_name_a = region_name_a if region_name_a is not None else _region_name_a
         self.region_name_b = region_name_b if region_name_b is not None else _region_name_b
+        self.seed = seed
+        self._randint = None
         self._return_day = None
+        self._at_home = None
+        self._returning_buf = None
+        self._go_buf = None
         self._cross_betas = {}
+        self._purpose_code = None
+        self._cross_edges = {}
+        self._adj = {}
+        self._zeroed = {}
+        self._n_away = 0
+        self._crosser_count = 0
+        self._views_people = None
+        self._crosser = None
 
     def initialize(self, sim):
         super().initialize()
@@ -277,35 +488,73 @@ class CrosserTravelMultilayer(cv.Intervention):
         if self.resume_day_outbound is not None:
             self.resume_day_outbound = sim.day(self.resume_day_outbound)
         n = sim.n
-        self._return_day = np.full(n, np.nan, dtype=float)
+        self._return_day = np.full(n, _AT_HOME, dtype=np.int32)  # 回国日；_AT_HOME 表示在境内
+        self._at_home = np.empty(n, dtype=bool)  # 每日可出境候鸟掩码的复用缓冲区
+        # 每日回国 / 出境人员下标的复用缓冲区（move_to 会复制下标，缓冲区次日可直接覆盖）
+        self._returning_buf = np.empty(n, dtype=np.int64)
+        self._go_buf = np.empty(n, dtype=np.int64)
+        # 境外停留天数的抽样函数：指定 seed 时使用独立随机数流（只建一次），否则沿用 covasim 已设种子的全局流
+        self._randint = np.random.default_rng(self.seed).integers if self.seed is not None else np.random.randint
         for lkey in ['cross_work', 'cross_community', 'cross_home']:
-            if lkey in sim['beta_layer']:
-                self._cross_betas[lkey] = float(sim['beta_layer'][lkey])
-            else:
-                self._cross_betas[lkey] = 0.6
+            self._cross_betas[lkey] = cvd.default_float(sim['beta_layer'].get(lkey, 0.6))
+        # 每日写入 beta 的常量，按 Covasim 默认浮点类型预先转换一次
+        self._f0 = cvd.default_float(0.0)
+        self._f1 = cvd.default_float(1.0)
         # 确保区内层有 beta 数组
         for lkey in ['home', 'school', 'work', 'community']:
             if lkey in sim.people.contacts:
                 layer = sim.people.contacts[lkey]
                 if 'beta' not in layer or len(layer['beta']) != len(layer['p1']):
                     layer['beta'] = np.ones(len(layer['p1']), dtype=cvd.default_float)
+        # 出行目的编码（见 CrossNetwork.PURPOSE_NAMES），整个仿真不变，只在此取一次；
+        # 旧人口无 crosser_purpose_code 时由 crosser_purpose 字符串换算
+        people = sim.people
+        purpose_code = getattr(people, 'crosser_purpose_code', None)
+        if purpose_code is None:
+            purpose_code = np.full(n, PURPOSE_NONE, dtype=np.uint8)
+            crosser_purpose = getattr(people, 'crosser_purpose', None)
+            if crosser_purpose is not None:
+                crosser_purpose = np.asarray(crosser_purpose)
+                for code, name in enumerate(PURPOSE_NAMES):
+                    purpose_code[crosser_purpose == name] = code
+        self._purpose_code = np.asarray(purpose_code)
+        self._cross_edges = {}
+        self._adj = {}
+        # 候鸟名单整个仿真不变，人数只数一次；_n_away 为当前在境外（有回国日）的候鸟数
+        crosser = _crosser_view(self, people)
+        self._crosser_count = 0 if crosser is None else int(crosser.sum())
+        self._n_away = 0
+        self._zeroed = {}
+
+    def _cross_edge_side(self, lkey, layer, crosser):
+        '''跨区层各边的 crosser 端下标及其 purpose 是否与该层相符（cross_community 为 None），
+        以及本次是否为新建（须全量写 beta）。跨区层静态，按层缓存，p1/p2 数组被替换时重算。'''
+        cached = self._cross_edges.get(lkey)
+        p1, p2 = layer['p1'], layer['p2']
+        is_new = cached is None or cached[0] is not p1 or cached[1] is not p2
+        if is_new:
+            c_ind = np.where(crosser[p1], p1, p2)
+            required = self._REQUIRED_PURPOSE.get(lkey)
+            purpose_ok = None if required is None else self._purpose_code[c_ind] == required
+            cached = self._cross_edges[lkey] = (p1, p2, c_ind, purpose_ok)
+        return cached[2], cached[3], is_new
 
     def apply(self, sim):
         t = sim.t
         people = sim.people
-        position = getattr(people, self.region_key, None)
-        country = getattr(people, 'country', None)
-        crosser = getattr(people, 'crosser', None)
-        crosser_purpose = getattr(people, 'crosser_purpose', None)
-        if position is None or country is None or crosser is None:
+        crosser = _crosser_view(self, people)
+        if crosser is None:
             return
         return_day = self._return_day
+        country_code = region_codes(sim, self.region_key)[1]
 
-        # 1) 到期者回国
-        returning = crosser & (return_day == t) & ~people.quarantined & ~people.isolated
-        if np.any(returning):
-            position[returning] = country[returning]
-            return_day[returning] = np.nan
+        # 1) 到期者回国（无人在境外时跳过扫描）
+        if self._n_away:
+            returning = _find_returning(crosser, return_day, t, people.quarantined, people.isolated, self._returning_buf)
+            if len(returning):
+                move_to(sim, returning, country_code[returning], self.region_key)
+                return_day[returning] = _AT_HOME
+                self._n_away -= len(returning)
 
         # 2) 从境内候鸟中按比例随机选人出境
         allow_outbound = (
@@ -316,65 +565,75 @@ class CrosserTravelMultilayer(cv.Intervention):
                 or (self.resume_day_outbound is not None and t >= self.resume_day_outbound)
             )
         )
-        if allow_outbound:
-            at_home = crosser & np.isnan(return_day) & ~people.quarantined & ~people.isolated
-            n_at_home = np.count_nonzero(at_home)
-            if n_at_home > 0 and self.frac_cross_per_day > 0:
+        if allow_outbound and self.frac_cross_per_day > 0 and self._crosser_count > 0:
+            at_home = self._at_home
+            n_at_home = _compute_at_home(crosser, return_day, people.quarantined, people.isolated, at_home)
+            if n_at_home > 0:
                 n_go = max(0, int(n_at_home * self.frac_cross_per_day + 0.5))
                 n_go = min(n_go, n_at_home)
                 if n_go > 0:
-                    at_home_inds = np.where(at_home)[0]
-                    go_inds = np.random.choice(at_home_inds, size=n_go, replace=False)
-                    dur = np.random.randint(self.duration_min, self.duration_max + 1, size=len(go_inds))
+                    go_inds = _sample_from_mask(at_home, n_go, n_at_home, self._go_buf)
+                    self._n_away += len(go_inds)
+                    dur = self._randint(self.duration_min, self.duration_max + 1, size=len(go_inds))
                     return_day[go_inds] = t + dur
-                    from_a = (np.asarray(country[go_inds]) == self.region_name_a)
-                    position[go_inds] = np.where(from_a, self.region_name_b, self.region_name_a)
-
-        # 3) 原属地各层权重冻结
-        is_abroad = (np.asarray(position) != np.asarray(country))
+                    # 两区互换：目的地编码 = code_a + code_b - 户籍地编码（候鸟户籍地只会是 A 或 B）
+                    code_a = region_code(sim, self.region_name_a, self.region_key)
+                    code_b = region_code(sim, self.region_name_b, self.region_key)
+                    move_to(sim, go_inds, code_a + code_b - country_code[go_inds], self.region_key)
+
+        # 3) 原属地各层权重冻结（move_to 已使当日区域缓存失效）：首次或边数组被替换（pop_inds / append，
+        #    append 回的边带着旧 beta）时全量写，此后只有移动过的人员（move_to 记录）的相邻边可能翻转
+        is_abroad = abroad_mask(sim, self.region_key)
+        moved = moved_since(sim, self)
         for lkey in ['home', 'school', 'work', 'community']:
             if lkey not in people.contacts:
                 continue
             layer = people.contacts[lkey]
-            p1, p2 = layer['p1'], layer['p2']
-            beta = layer['beta']
-            edge_abroad = is_abroad[p1] | is_abroad[p2]
-            beta[edge_abroad] = cvd.default_float(0.0)
-            beta[~edge_abroad] = cvd.default_float(1.0)
-
-        # 4) 跨区层按 purpose 激活
-        if crosser_purpose is None:
-            crosser_purpose = np.empty(people.n, dtype=object)
-            crosser_purpose[:] = ''
-        purpose = np.asarray(crosser_purpose)
-
+            p1, p2, beta = layer['p1'], layer['p2'], layer['beta']
+            cached = self._zeroed.get(lkey)
+            if moved is None or cached is None or cached[0] is not p1 or cached[1] is not p2:
+                _set_edge_beta(p1, p2, is_abroad, beta, self._f0, self._f1)
+                self._zeroed[lkey] = (p1, p2, is_abroad[p1] | is_abroad[p2])
+            elif len(moved):
+                zeroed = cached[2]
+                edges = _edges_touching(self._adj, lkey, layer, len(people), moved)
+                now = is_abroad[p1[edges]] | is_abroad[p2[edges]]
+                was = zeroed[edges]
+                beta[edges[now & ~was]] = self._f0
+                beta[edges[was & ~now]] = self._f1
+                zeroed[edges] = now
+
+        # 4) 跨区层按 purpose 激活：跨区层 beta 只由本干预写入，首次全量写，此后同样只改写移动人员的相邻边
         for lkey in ['cross_work', 'cross_community', 'cross_home']:
             if lkey not in people.contacts:
                 continue
             layer = people.contacts[lkey]
-            p1, p2 = layer['p1'], layer['p2']
             beta = layer['beta']
-            cb = self._cross_betas.get(lkey, 0.6)
+            cb = self._cross_betas[lkey]
             # 每条边一端为 crosser，判断该 crosser 是否 abroad 且符合 purpose
-            active = np.zeros(len(p1), dtype=bool)
-            for i in range(len(p1)):
-                c_ind = p1[i] if crosser[p1[i]] else p2[i]
-                if not is_abroad[c_ind]:
-                    continue
-                if lkey == 'cross_work' and purpose[c_ind] != 'work':
-                    continue
-                if lkey == 'cross_home' and purpose[c_ind] != 'visit':
-                    continue
-                active[i] = True
-            beta[active] = cvd.default_float(cb)
-            beta[~active] = cvd.default_float(0.0)
+            c_ind, purpose_ok, is_new = self._cross_edge_side(lkey, layer, crosser)
+            if is_new or moved is None:
+                active = is_abroad[c_ind]
+                if purpose_ok is not None:
+                    active &= purpose_ok
+                beta[active] = cb
+                beta[~active] = self._f0
+            elif len(moved):
+                edges = _edges_touching(self._adj, lkey, layer, len(people), moved)
+                active = is_abroad[c_ind[edges]]
+                if purpose_ok is not None:
+                    active &= purpose_ok[edges]
+                beta[edges] = np.where(active, cb, self._f0)
 
 
 # ========== 3c. 多层级口罩佩戴（指定层、仅 A 区） ==========
 class MaskWearingLayerSpecific(cv.Intervention):
     '''多层网络专用：在指定层（work、school）对涉及 A 区的 domestic 边，将 layer["beta"] 设为 efficacy。
-    须放在 CrosserTravelMultilayer 之后，因其每日重写 layer["beta"]，本干预在其后覆盖 domestic 边的值。
-    常规策略：工作层、学校层口罩佩戴，仅 A 区，100% 依从性。'''
+    须放在 CrosserTravelMultilayer 之后，因其在候鸟回国时把相邻边恢复为 1.0，本干预在其后覆盖 domestic 边的值。
+    常规策略：工作层、学校层口罩佩戴，仅 A 区，100% 依从性。
+    各层 domestic 边掩码只在首次（或层的边数组被替换后）全量计算并写入，此后仅对经 move_to 移动过的人员的相邻边重算：
+    新进入掩码的边写 efficacy，移出掩码且未跨境的边恢复为 1.0；end_day 之后的首日把掩码内的边恢复为 1.0。
+    同一层上其他仍生效的 MaskWearingLayerSpecific 所覆盖的边不恢复，由其自身负责。'''
     def __init__(
         self,
         layers=None,
@@ -392,35 +651,74 @@ class MaskWearingLayerSpecific(cv.Intervention):
         self.end_day = end_day
         self.region_key = region_key if region_key is not None else _region_key
         self.region_name_a = region_name_a if region_name_a is not None else _region_name_a
+        self._scratch = {}
+        self._domestic = {}
+        self._adj = {}
 
     def initialize(self, sim):
         super().initialize()
         self.start_day = sim.day(self.start_day)
         if self.end_day is not None:
             self.end_day = sim.day(self.end_day)
+        self._f1 = cvd.default_float(1.0)
 
     def apply(self, sim):
         if sim.t < self.start_day:
             return
-        if self.end_day is not None and sim.t > self.end_day:
+        ended = self.end_day is not None and sim.t > self.end_day
+        if ended and not self._domestic:
             return
         people = sim.people
-        position = getattr(people, self.region_key, None)
-        country = getattr(people, 'country', None)
-        if position is None or country is None:
+        if not _has_attrs(self, people, self.region_key, 'country'):
             return
-        in_a = (np.asarray(position) == self.region_name_a)
-        is_abroad = (np.asarray(position) != np.asarray(country))
+        in_a = in_region_mask(sim, self.region_key, self.region_name_a)
+        is_abroad = abroad_mask(sim, self.region_key)
+        moved = moved_since(sim, self)
         for lkey in self.layers:
             if lkey not in people.contacts:
                 continue
             layer = people.contacts[lkey]
             p1, p2 = layer['p1'], layer['p2']
-            beta = layer['beta']
-            edge_in_a = in_a[p1] | in_a[p2]
-            edge_abroad = is_abroad[p1] | is_abroad[p2]
-            domestic_in_a = edge_in_a & ~edge_abroad
-            beta[domestic_in_a] = self.efficacy
+            cached = self._domestic.get(lkey)
+            if moved is None or cached is None or cached[0] is not p1 or cached[1] is not p2:
+                domestic_in_a = _domestic_edges_in(self._scratch, lkey, p1, p2, in_a, is_abroad).copy()
+                self._domestic[lkey] = (p1, p2, domestic_in_a)
+                if ended:
+                    self._restore(sim, lkey, layer, np.flatnonzero(domestic_in_a), is_abroad)
+                else:
+                    layer['beta'][domestic_in_a] = self.efficacy
+                continue
+            domestic_in_a = cached[2]
+            if len(moved):
+                # 所在地只在移动人员处变化，只需重算其相邻边
+                edges = _edges_touching(self._adj, lkey, layer, len(people), moved)
+                e1, e2 = p1[edges], p2[edges]
+                now = (in_a[e1] | in_a[e2]) & ~(is_abroad[e1] | is_abroad[e2])
+                was = domestic_in_a[edges]
+                domestic_in_a[edges] = now
+                if not ended:
+                    layer['beta'][edges[now & ~was]] = self.efficacy
+                self._restore(sim, lkey, layer, edges[was & ~now], is_abroad)
+            if ended:
+                self._restore(sim, lkey, layer, np.flatnonzero(domestic_in_a), is_abroad)
+        if ended:
+            self._domestic = {}
+
+    def _restore(self, sim, lkey, layer, edges, is_abroad):
+        '''将 edges 中未跨境的边（跨境边由 CrosserTravelMultilayer 置 0）恢复为 1.0；
+        同层其他仍生效的 MaskWearingLayerSpecific 覆盖的边改写为其 efficacy。'''
+        if not len(edges):
+            return
+        p1 = layer['p1']
+        edges = edges[~(is_abroad[p1[edges]] | is_abroad[layer['p2'][edges]])]
+        vals = np.full(len(edges), self._f1, dtype=layer['beta'].dtype)
+        for intv in sim['interventions']:
+            if intv is self or not isinstance(intv, MaskWearingLayerSpecific):
+                continue
+            other = intv._domestic.get(lkey)
+            if other is not None and other[0] is p1:
+                vals[other[2][edges]] = intv.efficacy
+        layer['beta'][edges] = vals
 
 
 # ========== 3e. A 区居家办公（工作层减边） ==========
@@ -434,6 +732,7 @@ class WorkFromHomeA(cv.Intervention):
         self.region_name_a = region_name_a if region_name_a is not None else _region_name_a
         self.fraction = fraction
         self.seed = seed
+        self._rng = None
         self._stored_contacts = None
         self._applied = False
 
@@ -442,30 +741,27 @@ class WorkFromHomeA(cv.Intervention):
         self.start_day = sim.day(self.start_day)
         if self.end_day is not None:
             self.end_day = sim.day(self.end_day)
+        # 指定 seed 时使用独立随机数流（只建一次），否则沿用 covasim 已设种子的全局流
+        self._rng = np.random.default_rng(self.seed) if self.seed is not None else np.random
 
     def apply(self, sim):
         lkey = 'work'
         if lkey not in sim.people.contacts:
             return
         layer = sim.people.contacts[lkey]
-        region = getattr(sim.people, self.region_key, None)
-        if region is None:
+        if not _has_attrs(self, sim.people, self.region_key):
             return
-        in_a = (np.asarray(region) == self.region_name_a)
+        in_a = in_region_mask(sim, self.region_key, self.region_name_a)
 
         if sim.t == self.start_day and not self._applied:
-            p1, p2 = layer['p1'][:], layer['p2'][:]
-            edge_in_a = in_a[p1] | in_a[p2]
-            n_total = edge_in_a.sum()
+            inds_all = _region_edge_inds(layer, in_a)
+            n_total = len(inds_all)
             if n_total == 0:
                 return
             n_remove = int(n_total * (1 - self.fraction))
             if n_remove <= 0:
                 return
-            inds_all = np.where(edge_in_a)[0]
-            rng = np.random.RandomState(self.seed) if self.seed is not None else np.random
-            rng.shuffle(inds_all)
-            to_remove = inds_all[:n_remove]
+            to_remove = _choose_edges(self._rng, inds_all, n_remove)
             self._stored_contacts = layer.pop_inds(to_remove)
             self._applied = True
         elif self.end_day is not None and sim.t == self.end_day and self._applied:
@@ -483,6 +779,7 @@ class SchoolCloseA(cv.Intervention):
         self.region_key = region_key if region_key is not None else _region_key
         self.region_name_a = region_name_a if region_name_a is not None else _region_name_a
         self.seed = seed
+        self._rng = None
         self._stored_contacts = None
         self._applied = False
 
@@ -491,26 +788,24 @@ class SchoolCloseA(cv.Intervention):
         self.start_day = sim.day(self.start_day)
         if self.end_day is not None:
             self.end_day = sim.day(self.end_day)
+        # 指定 seed 时使用独立随机数流（只建一次），否则沿用 covasim 已设种子的全局流
+        self._rng = np.random.default_rng(self.seed) if self.seed is not None else np.random
 
     def apply(self, sim):
         lkey = 'school'
         if lkey not in sim.people.contacts:
             return
         layer = sim.people.contacts[lkey]
-        region = getattr(sim.people, self.region_key, None)
-        if region is None:
+        if not _has_attrs(self, sim.people, self.region_key):
             return
-        in_a = (np.asarray(region) == self.region_name_a)
+        in_a = in_region_mask(sim, self.region_key, self.region_name_a)
 
         if sim.t == self.start_day and not self._applied:
-            p1, p2 = layer['p1'][:], layer['p2'][:]
-            edge_in_a = in_a[p1] | in_a[p2]
-            n_total = edge_in_a.sum()
+            inds_all = _region_edge_inds(layer, in_a)
+            n_total = len(inds_all)
             if n_total == 0:
                 return
-            inds_all = np.where(edge_in_a)[0]
-            rng = np.random.RandomState(self.seed) if self.seed is not None else np.random
-            rng.shuffle(inds_all)
+            self._rng.shuffle(inds_all)
             self._stored_contacts = layer.pop_inds(inds_all)
             self._applied = True
         elif self.end_day is not None and sim.t == self.end_day and self._applied:
@@ -529,6 +824,7 @@ class CommunityRestrictA(cv.Intervention):
         self.region_name_a = region_name_a if region_name_a is not None else _region_name_a
         self.fraction = fraction
         self.seed = seed
+        self._rng = None
         self._stored_contacts = None
         self._applied = False
 
@@ -537,30 +833,27 @@ class CommunityRestrictA(cv.Intervention):
         self.start_day = sim.day(self.start_day)
         if self.end_day is not None:
             self.end_day = sim.day(self.end_day)
+        # 指定 seed 时使用独立随机数流（只建一次），否则沿用 covasim 已设种子的全局流
+        self._rng = np.random.default_rng(self.seed) if self.seed is not None else np.random
 
     def apply(self, sim):
         lkey = 'community'
         if lkey not in sim.people.contacts:
             return
         layer = sim.people.contacts[lkey]
-        region = getattr(sim.people, self.region_key, None)
-        if region is None:
+        if not _has_attrs(self, sim.people, self.region_key):
             return
-        in_a = (np.asarray(region) == self.region_name_a)
+        in_a = in_region_mask(sim, self.region_key, self.region_name_a)
 
         if sim.t == self.start_day and not self._applied:
-            p1, p2 = layer['p1'][:], layer['p2'][:]
-            edge_in_a = in_a[p1] | in_a[p2]
-            n_total = edge_in_a.sum()
+            inds_all = _region_edge_inds(layer, in_a)
+            n_total = len(inds_all)
             if n_total == 0:
                 return
             n_remove = int(n_total * (1 - self.fraction))
             if n_remove <= 0:
                 return
-            inds_all = np.where(edge_in_a)[0]
-            rng = np.random.RandomState(self.seed) if self.seed is not None else np.random
-            rng.shuffle(inds_all)
-            to_remove = inds_all[:n_remove]
+            to_remove = _choose_edges(self._rng, inds_all, n_remove)
             self._stored_contacts = layer.pop_inds(to_remove)
             self._applied = True
         elif self.end_day is not None and sim.t == self.end_day and self._applied:
@@ -597,7 +890,7 @@ class MaskWearing(cv.Intervention):
             wear_inds = inds
         else:
             n_wear = min(len(inds), int(len(inds) * self.fraction + 0.5))
-            wear_inds = np.random.choice(inds, size=n_wear, replace=False) if n_wear > 0 else np.array([], dtype=int)
+            wear_inds = _sample_without_replacement(np.asarray(inds), n_wear)
         if len(wear_inds) > 0:
             sim.people.rel_trans[wear_inds] *= self.efficacy
         self._applied = True
@@ -631,7 +924,7 @@ class MaskRelax(cv.Intervention):
             relax_inds = inds
         else:
             n_relax = min(len(inds), int(len(inds) * self.fraction + 0.5))
-            relax_inds = np.random.choice(inds, size=n_relax, replace=False) if n_relax > 0 else np.array([], dtype=int)
+            relax_inds = _sample_without_replacement(np.asarray(inds), n_relax)
         if len(relax_inds) > 0 and self.efficacy != 0:
             sim.people.rel_trans[relax_inds] /= self.efficacy
         self._applied = True
@@ -658,17 +951,17 @@ class InjectUndocumentedInfectious(cv.Intervention):
         if sim.t != self.inject_day or self._applied:
             return
         people = sim.people
-        position = getattr(people, self.region_key, None)
-        if position is None:
+        if not _has_attrs(self, people, self.region_key):
             return
-        in_a = (np.asarray(position) == self.region_name_a)
+        in_a = in_region_mask(sim, self.region_key, self.region_name_a)
         candidates = np.where(in_a & people.susceptible)[0]
         n_inject = min(self.n, len(candidates))
         if n_inject <= 0:
             self._applied = True
             return
-        inds = np.random.choice(candidates, size=n_inject, replace=False)
+        inds = _sample_without_replacement(candidates, n_inject)
         people.undocumented[inds] = True
+        register_sim(sim)  # undocumented 变化，使当日按其筛选的 subtarget 缓存失效
         people.infect(inds, source=None, layer=None)
         people.dur_exp2inf[inds] = 0
         people.date_infectious[inds] = sim.t
@@ -697,15 +990,21 @@ class MaskWearingTwoPhase(cv.Intervention):
         self.fraction_1 = fraction_1
         self.fraction_2 = fraction_2
         self.subtarget = subtarget
-        self._wearing_inds = None  # 已在第一阶段戴口罩的人的索引集合
+        self._wearing_mask = None  # 已戴口罩人员的布尔表（按人员索引）
+        self._n_wearing = 0
 
     def initialize(self, sim):
         super().initialize()
         self.start_day_1 = sim.day(self.start_day_1)
         self.start_day_2 = sim.day(self.start_day_2)
-        self._wearing_inds = set()
+        self._wearing_mask = np.zeros(sim.n, dtype=bool)
+        self._n_wearing = 0
 
     def apply(self, sim):
+        t = sim.t
+        # 只在两个阶段日动作，其余日子不必计算 subtarget
+        if t != self.start_day_1 and t != self.start_day_2:
+            return
         if self.subtarget is not None and 'inds' in self.subtarget:
             inds = np.array(self.subtarget['inds'](sim), dtype=int)
         else:
@@ -713,32 +1012,33 @@ class MaskWearingTwoPhase(cv.Intervention):
         if len(inds) == 0:
             return
 
-        t = sim.t
-
         # 第一阶段：在 start_day_1 对 fraction_1 比例的人应用口罩
         if t == self.start_day_1:
             n1 = min(len(inds), int(len(inds) * self.fraction_1 + 0.5))
             if n1 > 0:
-                wear_1 = np.random.choice(inds, size=n1, replace=False)
+                wear_1 = _sample_without_replacement(inds, n1)
                 if len(wear_1) > 0:
                     sim.people.rel_trans[wear_1] *= self.efficacy
-                    self._wearing_inds = set(wear_1.tolist())
+                    self._wearing_mask[:] = False
+                    self._wearing_mask[wear_1] = True
+                    self._n_wearing = int(np.count_nonzero(self._wearing_mask))
 
         # 第二阶段：在 start_day_2 对剩余的人（使总比例达到 fraction_2）应用口罩
         elif t == self.start_day_2:
             # 计算第二阶段需要达到的总人数
             n_total_target = min(len(inds), int(len(inds) * self.fraction_2 + 0.5))
             # 计算还需要新增的人数
-            n_already_wearing = len(self._wearing_inds)
+            n_already_wearing = self._n_wearing
             n_to_add = max(0, n_total_target - n_already_wearing)
 
             if n_to_add > 0:
                 # 找出尚未戴口罩的人
-                remaining = inds[~np.isin(inds, list(self._wearing_inds))]
+                remaining = inds[~self._wearing_mask[inds]]
                 if len(remaining) > 0:
                     # 从剩余的人中随机选择需要新增的人数
                     n_select = min(n_to_add, len(remaining))
-                    wear_2 = np.random.choice(remaining, size=n_select, replace=False)
+                    wear_2 = _sample_without_replacement(remaining, n_select)
                     if len(wear_2) > 0:
                         sim.people.rel_trans[wear_2] *= self.efficacy
-                        self._wearing_inds.update(wear_2.tolist())
+                        self._wearing_mask[wear_2] = True
+                        self._n_wearing = int(np.count_nonzero(self._wearing_mask))
@@ -1,5 +1,7 @@
 # 组合干预情景用到的辅助函数与 subtarget 构造
 import numpy as np
+import numba as nb
+import covasim.utils as cvu
 
 # 默认区域键与名称（与 compose_intervention 中一致，可按需覆盖）
 REGION_KEY = 'position'
@@ -7,6 +9,212 @@ REGION_NAME_A = 'A'
 REGION_NAME_B = 'B'
 
 
+# 区域成员缓存：同一 People 对象、同一仿真日内多个 subtarget（检测、疫苗接种等）及干预共享同一份数组，
+# 避免每个干预各自扫描 people.position、各自分配 np.arange(sim.n)。缓存挂在 people 上（见 _region_state），
+# 随 people 一起深拷贝 / 序列化，不同 sim 之间互不共享；仿真日变化时自动失效，改变 position 的干预
+# （CrosserTravel*）移动人员后调用 register_sim 使当日缓存失效。缓存中的数组均设为只读，同日所有调用方共享。
+class _RegionState:
+    '''挂在 people._region_state 上的区域状态（下划线属性，不计入 people.keys() 的每人数组）。'''
+
+    def __init__(self):
+        self.t = None
+        self.cache = {}
+        # 区域编码：区域名表 names 及户籍地 / 所在地的 int8 编码（names[code] 即区域名），每个 People 对象
+        # 只由字符串换算一次，区域掩码改用整数比较。所在地的变化须经 move_to 同步编码。
+        self.codes = {}
+        # 移动记录：经 move_to 改变过所在地的人员下标，按调用顺序追加（log_start 为 log[0] 的序号）。
+        # readers 记录各读取方（moved_since 的 reader）已读到的序号及读取日，所有读取方都已读过的记录即被丢弃；
+        # 超过一日未读的读取方被注销，下次读取时全量重算
+        self.log = []
+        self.log_start = 0
+        self.readers = {}
+        # make_subtarget_position 按 (region_key, region_name) 维护的 (inds, 区域掩码)，只对移动人员增量更新
+        self.subtargets = {}
+
+
+def _region_state(people):
+    """取 people 上的区域状态，不存在时新建。"""
+    state = people.__dict__.get('_region_state')
+    if state is None:
+        state = people._region_state = _RegionState()
+    return state
+
+
+def register_sim(sim):
+    """清空 sim.people 上的当日区域缓存（人员移动或新增 undocumented 后调用；仿真日变化时也会自动清空）。"""
+    state = _region_state(sim.people)
+    state.cache.clear()
+    state.t = sim.t
+
+
+def _cached(sim, key, func):
+    """按 key 取 sim.people 在当前仿真日的缓存数组，不存在时调用 func() 生成并设为只读。"""
+    state = _region_state(sim.people)
+    if state.t != sim.t:
+        register_sim(sim)
+    out = state.cache.get(key)
+    if out is None:
+        out = state.cache[key] = func()
+        out.flags.writeable = False
+    return out
+
+
+def region_codes(sim, region_key=None):
+    """返回 (names, country_code, position_code)：区域名数组及户籍地、所在地的 int8 编码，按 People 对象缓存整个仿真。"""
+    return _people_region_codes(sim.people, region_key)
+
+
+def _people_region_codes(people, region_key=None):
+    """region_codes 的实现，供只拿到 people 的调用方（如接种顺序函数）使用。"""
+    rk = _default_region_key(region_key)
+    codes = _region_state(people).codes
+    if 'names' not in codes:
+        names, country_code = np.unique(np.asarray(people.country), return_inverse=True)
+        codes.update(names=names, country=country_code.astype(np.int8))
+    key = ('position', rk)
+    if key not in codes:
+        names = codes['names']
+        position = np.asarray(getattr(people, rk))
+        position_code = np.searchsorted(names, position)
+        valid = position_code < len(names)
+        valid[valid] = names[position_code[valid]] == position[valid]
+        if not valid.all():
+            missing = np.unique(position[~valid])
+            raise ValueError(f'{rk} 中的区域 {missing.tolist()} 不在户籍地 country 的取值 {names.tolist()} 中，无法编码')
+        codes[key] = position_code.astype(np.int8)
+    return codes['names'], codes['country'], codes[key]
+
+
+def region_code(sim, region_name, region_key=None):
+    """区域名对应的编码；不存在时返回 -1（与任何人的编码都不相等）。"""
+    names = region_codes(sim, region_key)[0]
+    hits = np.flatnonzero(names == region_name)
+    return int(hits[0]) if len(hits) else -1
+
+
+def move_to(sim, inds, codes, region_key=None):
+    """将 inds（索引或布尔掩码）人员的所在地改为 names[codes]，同步更新所在地字符串与编码，并使当日区域缓存失效。"""
+    rk = _default_region_key(region_key)
+    names, _, position_code = region_codes(sim, rk)
+    getattr(sim.people, rk)[inds] = names[codes]
+    position_code[inds] = codes
+    state = _region_state(sim.people)
+    _trim_log(state, sim.t)
+    if state.readers:  # 无读取方时不必记录：首次读取总是全量重算
+        inds = np.asarray(inds)
+        state.log.append(np.flatnonzero(inds) if inds.dtype == bool else inds.copy())
+    register_sim(sim)
+
+
+def moved_since(sim, reader):
+    """返回 reader（任意可哈希对象，通常为干预自身）上次读取以来经 move_to 改变所在地的人员下标（可能重复）。
+    reader 首次读取（或因超过一日未读已被注销）时返回 None，调用方须全量重算。"""
+    state = _region_state(sim.people)
+    end = state.log_start + len(state.log)
+    last = state.readers.get(reader)
+    state.readers[reader] = (end, sim.t)
+    if last is None:
+        inds = None
+    else:
+        new = state.log[last[0] - state.log_start:]
+        inds = np.concatenate(new) if new else np.empty(0, dtype=np.int64)
+    _trim_log(state, sim.t)
+    return inds
+
+
+def _trim_log(state, t):
+    """注销超过一日未读的读取方，丢弃所有读取方都已读过的移动记录。"""
+    for reader in [r for r, (_, day) in state.readers.items() if day < t - 1]:
+        del state.readers[reader]
+    low = min((mark for mark, _ in state.readers.values()), default=state.log_start + len(state.log))
+    del state.log[:low - state.log_start]
+    state.log_start = low
+
+
+def in_region_mask(sim, region_key=None, region_name=None):
+    """当日所在地为指定区域（默认 position=='A'）的布尔数组；同日各干预间共享（只读）。"""
+    rk = _default_region_key(region_key)
+    rn = REGION_NAME_A if region_name is None else region_name
+    people = sim.people
+
+    def compute():
+        if getattr(people, 'country', None) is None:  # 无户籍属性时无法编码，退回字符串比较
+            return np.asarray(getattr(people, rk)) == rn
+        return region_codes(sim, rk)[2] == region_code(sim, rn, rk)
+
+    return _cached(sim, ('in', rk, rn), compute)
+
+
+def abroad_mask(sim, region_key=None):
+    """当日所在地不同于户籍地（position != country）的布尔数组；同日各干预间共享（只读）。"""
+    rk = _default_region_key(region_key)
+
+    def compute():
+        _, country_code, position_code = region_codes(sim, rk)
+        return position_code != country_code
+
+    return _cached(sim, ('abroad', rk), compute)
+
+
+# 每人状态位（person_flags）：所在地 A / B、候鸟、偷渡，组合条件只需一次按位与 + 比较
+FLAG_A = 1
+FLAG_B = 2
+FLAG_CROSSER = 4
+FLAG_UNDOCUMENTED = 8
+
+# 本模块与 my_intervention 中的 Numba 内核均缓存编译结果：机器码写入 __pycache__，
+# MultiSim / cv.parallel 的子进程直接加载缓存，不再各自 JIT。不使用 numba.pycc 预编译：
+# 该模块已弃用、不支持 prange，且预编译函数的随机数状态不受 cv.utils.set_seed 控制。
+# 含 prange 的内核与 Covasim 自身的内核一样按 cv.options.numba_parallel 决定是否多线程（默认 none，单线程）：
+# TBB / OpenMP 线程池启动后再 fork 出的 cv.parallel 子进程会死锁，故不固定 parallel=True。
+# 这些内核不用随机数，safe / full 下结果不变；缓存随 numba_cache，切换并行选项后不会载入旧的编译结果。
+
+@nb.njit(parallel=cvu.safe_parallel, cache=cvu.cache)
+def _pack_flags(position_code, code_a, code_b, crosser, undocumented, out):
+    """单次遍历将所在地编码与 crosser / undocumented 打包为 uint8 状态位。"""
+    for i in nb.prange(len(out)):
+        f = 0
+        if position_code[i] == code_a:
+            f |= FLAG_A
+        elif position_code[i] == code_b:
+            f |= FLAG_B
+        if crosser[i]:
+            f |= FLAG_CROSSER
+        if undocumented[i]:
+            f |= FLAG_UNDOCUMENTED
+        out[i] = f
+    return out
+
+
+@nb.njit(parallel=cvu.safe_parallel, cache=cvu.cache)
+def _flag_vals(flags, mask, value, prob, out):
+    """out[i] = prob（flags[i] & mask == value）否则 0；单次遍历写入，不生成中间布尔数组。"""
+    for i in nb.prange(len(out)):
+        out[i] = prob if (flags[i] & mask) == value else 0.0
+    return out
+
+
+def person_flags(sim, region_key=None, region_name_a=None, region_name_b=None):
+    """当日每人的 uint8 状态位（FLAG_A / FLAG_B / FLAG_CROSSER / FLAG_UNDOCUMENTED），需有 country 属性；
+    同日各调用方间共享（只读），人员移动或新增 undocumented 时失效。"""
+    rk = _default_region_key(region_key)
+    rna = _default_region_name_a(region_name_a)
+    rnb = _default_region_name_b(region_name_b)
+    people = sim.people
+
+    def compute():
+        n = len(people)
+        crosser = getattr(people, 'crosser', None)
+        undocumented = getattr(people, 'undocumented', None)
+        none = np.zeros(n, dtype=bool) if crosser is None or undocumented is None else None
+        return _pack_flags(region_codes(sim, rk)[2], region_code(sim, rna, rk), region_code(sim, rnb, rk),
+                           np.asarray(crosser, dtype=bool) if crosser is not None else none,
+                           np.asarray(undocumented, dtype=bool) if undocumented is not None else none,
+                           np.empty(n, dtype=np.uint8))
+
+    return _cached(sim, ('flags', rk, rna, rnb), compute)
+
+
 def _default_region_key(region_key):
     return REGION_KEY if region_key is None else region_key
 
@@ -20,51 +228,88 @@ def _default_region_name_b(region_name_b):
 
 
 def is_position_a(sim, region_key=None, region_name=None):
-    """当前所在地为 A 区（默认 position=='A'）。"""
-    rk = _default_region_key(region_key)
-    rn = REGION_NAME_A if region_name is None else region_name
-    return np.asarray(getattr(sim.people, rk)) == rn
+    """当前所在地为 A 区（默认 position=='A'）；即 in_region_mask，同日共享（只读）。"""
+    return in_region_mask(sim, region_key, REGION_NAME_A if region_name is None else region_name)
 
 
 def is_position_b(sim, region_key=None, region_name=None):
-    """当前所在地为 B 区（默认 position=='B'）。"""
-    rk = _default_region_key(region_key)
-    rn = REGION_NAME_B if region_name is None else region_name
-    return np.asarray(getattr(sim.people, rk)) == rn
+    """当前所在地为 B 区（默认 position=='B'）；即 in_region_mask，同日共享（只读）。"""
+    return in_region_mask(sim, region_key, REGION_NAME_B if region_name is None else region_name)
 
 
 def get_crosser_inds(sim, region_key=None, region_name_a=None):
     """候鸟：当前在 A 区且为跨境人员（crosser）。"""
     in_a = is_position_a(sim, region_key=region_key, region_name=region_name_a or REGION_NAME_A)
-    return np.where(in_a & sim.people.crosser)[0]
+    return np.flatnonzero(in_a & sim.people.crosser)
 
 
 def is_country_a_crosser(sim, region_name_a=None):
     """A 区户籍且为跨境人员（crosser），用于边境检测仅对 A 区候鸟生效。"""
     rn = _default_region_name_a(region_name_a)
-    return (np.asarray(sim.people.country) == rn) & np.asarray(sim.people.crosser)
+    country_code = region_codes(sim)[1]
+    return (country_code == region_code(sim, rn)) & sim.people.crosser
 
 
 def is_position_a_crosser(sim, region_key=None, region_name_a=None):
     """当前在 A 区且为跨境人员（crosser），用于边境检测包含所有在 A 区的候鸟。"""
-    in_a = is_position_a(sim, region_key=region_key, region_name=region_name_a or REGION_NAME_A)
-    return in_a & np.asarray(sim.people.crosser)
+    if getattr(sim.people, 'country', None) is None:  # 无户籍属性时无法编码，退回布尔运算
+        in_a = is_position_a(sim, region_key=region_key, region_name=region_name_a or REGION_NAME_A)
+        return in_a & sim.people.crosser
+    select = FLAG_A | FLAG_CROSSER
+    return (person_flags(sim, region_key, region_name_a) & select) == select
 
 
+# 各 subtarget 的 vals：Covasim 只把它们写入（或乘入）自身的 float64 概率数组，不修改 vals 本身。
+# 0/1 型 vals 直接给布尔数组（每人 1 字节），概率型 vals 用 float32
 def make_subtarget_position(region_key=None, region_name=None):
-    """构造按区域筛选的 subtarget（检测/疫苗接种等共用）。"""
+    """构造按区域筛选的 subtarget（检测/疫苗接种等共用）。
+    inds 与区域掩码按 People 对象只算一次（同一区域的各 subtarget 共用），之后只对 move_to 记录中改变所在地的人员
+    更新掩码，不再每日全量比较；返回的 vals 为只读视图。"""
     rk = _default_region_key(region_key)
     rn = REGION_NAME_A if region_name is None else region_name
+    key = (rk, rn)
+
+    def _refresh(sim):
+        people = sim.people
+        state = _region_state(people)
+        moved = moved_since(sim, ('subtarget', rk, rn))
+        if moved is None or key not in state.subtargets:
+            state.subtargets[key] = (np.arange(sim.n), in_region_mask(sim, rk, rn).copy())  # 当日共享掩码只读，留一份副本
+        elif len(moved):
+            mask = state.subtargets[key][1]
+            if getattr(people, 'country', None) is None:  # 无户籍属性时无法编码，退回字符串比较
+                mask[moved] = np.asarray(getattr(people, rk))[moved] == rn
+            else:
+                mask[moved] = region_codes(sim, rk)[2][moved] == region_code(sim, rn, rk)
+        return state.subtargets[key]
 
     def inds(sim):
-        return np.arange(sim.n)
+        return _refresh(sim)[0]
 
     def vals(sim):
-        return (np.asarray(getattr(sim.people, rk)) == rn).astype(float)
+        mask = _refresh(sim)[1].view()
+        mask.flags.writeable = False
+        return mask
 
     return {'inds': inds, 'vals': vals}
 
 
+def _crosser_prob_vals(sim, region_key, region_name_a, crosser_prob, exclude_undocumented):
+    """边境检测 subtarget 的 vals：在 A 区的候鸟（可排除 undocumented）为 crosser_prob，其余 0。"""
+    people = sim.people
+    if getattr(people, 'country', None) is None:  # 无户籍属性时无法编码，退回布尔运算
+        mask = is_position_a_crosser(sim, region_key=region_key, region_name_a=region_name_a)
+        undocumented = getattr(people, 'undocumented', None) if exclude_undocumented else None
+        if undocumented is not None:
+            mask = mask & ~undocumented
+        return np.where(mask, np.float32(crosser_prob), np.float32(0.0))
+    flags = person_flags(sim, region_key, region_name_a)
+    select = FLAG_A | FLAG_CROSSER
+    out = np.empty(len(people), dtype=np.float32)
+    return _flag_vals(flags, select | FLAG_UNDOCUMENTED if exclude_undocumented else select, select,
+                      np.float32(crosser_prob), out)
+
+
 def make_subtarget_crosser(crosser_prob=0.5, region_key=None, region_name_a=None):
     """边境检测 subtarget：在 A 区的候鸟为 crosser_prob，其余人 0。"""
     rk = _default_region_key(region_key)
@@ -74,24 +319,26 @@ def make_subtarget_crosser(crosser_prob=0.5, region_key=None, region_name_a=None
         return np.arange(sim.n)
 
     def vals(sim):
-        in_a_crosser = is_position_a_crosser(sim, region_key=rk, region_name_a=rna)
-        return np.where(in_a_crosser, float(crosser_prob), 0.0).astype(float)
+        return _crosser_prob_vals(sim, rk, rna, crosser_prob, exclude_undocumented=False)
 
     return {'inds': inds, 'vals': vals}
 
 
 def make_subtarget_position_exclude_undocumented(region_key=None, region_name=None):
-    """构造按区域筛选且排除 undocumented 的 subtarget（case05 境内检测用）。"""
+    """构造按区域筛选且排除 undocumented 的 subtarget（case05 境内检测用）；返回的 inds 同日共享（只读）。"""
     rk = _default_region_key(region_key)
     rn = REGION_NAME_A if region_name is None else region_name
 
     def inds(sim):
-        undocumented = getattr(sim.people, 'undocumented', np.zeros(sim.n, dtype=bool))
-        in_region = (np.asarray(getattr(sim.people, rk)) == rn)
-        return np.where(in_region & ~undocumented)[0]
+        # 同日 inds / vals 共用一次计算结果（人员移动或新增 undocumented 时失效）
+        def compute():
+            in_region = in_region_mask(sim, rk, rn)
+            undocumented = getattr(sim.people, 'undocumented', None)
+            return np.flatnonzero(in_region & ~undocumented) if undocumented is not None else np.flatnonzero(in_region)
+        return _cached(sim, ('pos_doc', rk, rn), compute)
 
     def vals(sim):
-        return np.ones(len(inds(sim)), dtype=float)
+        return np.ones(len(inds(sim)), dtype=bool)
 
     return {'inds': inds, 'vals': vals}
 
@@ -105,9 +352,7 @@ def make_subtarget_crosser_exclude_undocumented(crosser_prob=0.5, region_key=Non
         return np.arange(sim.n)
 
     def vals(sim):
-        undocumented = getattr(sim.people, 'undocumented', np.zeros(sim.n, dtype=bool))
-        in_a_crosser = is_position_a_crosser(sim, region_key=rk, region_name_a=rna)
-        return np.where(in_a_crosser & ~undocumented, float(crosser_prob), 0.0).astype(float)
+        return _crosser_prob_vals(sim, rk, rna, crosser_prob, exclude_undocumented=True)
 
     return {'inds': inds, 'vals': vals}
 
@@ -121,12 +366,21 @@ def sequence_crosser_first_then_random_a(people, region_key=None, region_name_a=
     """A 区优先候鸟接种，多余剂量对 A 区其他人随机。"""
     rk = _default_region_key(region_key)
     rna = _default_region_name_a(region_name_a)
-    is_a = np.asarray(getattr(people, rk)) == rna
-    inds_crosser = np.where(is_a & people.crosser)[0]
-    inds_other_a = np.where(is_a & ~people.crosser)[0]
-    np.random.shuffle(inds_crosser)
-    np.random.shuffle(inds_other_a)
-    return np.concatenate([inds_crosser, inds_other_a])
+    if getattr(people, 'country', None) is None:  # 无户籍属性时无法编码，退回字符串比较
+        idx = np.flatnonzero(np.asarray(getattr(people, rk)) == rna)
+    else:
+        names, _, position_code = _people_region_codes(people, rk)
+        hits = np.flatnonzero(names == rna)
+        idx = np.flatnonzero(position_code == hits[0]) if len(hits) else np.empty(0, dtype=np.int64)
+    # 先候鸟、后其他人，两组各按随机键排序后直接写入预分配的 int32 结果（pop_size < 2**31），
+    # 不经 lexsort 的双键排序，也不 concatenate 两组结果
+    is_crosser = people.crosser[idx]
+    keys = np.random.random(len(idx))
+    first, rest = idx[is_crosser], idx[~is_crosser]
+    out = np.empty(len(idx), dtype=np.int32)
+    out[:len(first)] = first[np.argsort(keys[is_crosser])]
+    out[len(first):] = rest[np.argsort(keys[~is_crosser])]
+    return out
 
 
 def create_vaccination_schedule(total_doses, daily_doses, start_day=0):
@@ -145,12 +399,46 @@ def create_vaccination_schedule(total_doses, daily_doses, start_day=0):
         num_doses = create_vaccination_schedule(total_doses=10000, daily_doses=500, start_day=0)
         # 返回 {0: 500, 1: 500, ..., 19: 500}（共20天，每天500剂）
     """
-    num_doses_dict = {}
-    remaining = total_doses
-    day = start_day
-    while remaining > 0:
-        doses_today = min(daily_doses, remaining)
-        num_doses_dict[day] = doses_today
-        remaining -= doses_today
-        day += 1
+    if total_doses <= 0:
+        return {}
+    # 整天数与最后一天的余量直接算出，不逐日累减
+    n_full, rem = divmod(total_doses, daily_doses)
+    n_full = int(n_full)
+    num_doses_dict = dict.fromkeys(range(start_day, start_day + n_full), daily_doses)
+    if rem:
+        num_doses_dict[start_day + n_full] = rem
     return num_doses_dict
+
+
+def save_sims_results(sims, results_dir, name='all_scenarios', excel=False):
+    """
+    把多个 sim 的结果合并为一张表（scenario 列为 sim.label），一次写入 results_dir/<name>.parquet。
+
+    Parquet 为二进制列存，比逐个 sim.to_excel 快且小得多；excel=True 时另写一个多 sheet 工作簿
+    （一次压缩，每个情景一个 sheet）。未安装 pyarrow / fastparquet 时退回写工作簿。
+
+    Args:
+        sims: 已运行的 sim 列表（如 msim.sims）
+        results_dir: 输出目录
+        name: 文件名（不含扩展名）
+        excel: 是否同时输出 .xlsx
+
+    Returns:
+        pandas.DataFrame: 合并后的结果表
+    """
+    import os
+    import pandas as pd
+
+    dfs = [sim.to_df() for sim in sims]
+    df = pd.concat([d.assign(scenario=sim.label) for d, sim in zip(dfs, sims)], ignore_index=True)
+    os.makedirs(results_dir, exist_ok=True)
+    try:
+        df.to_parquet(os.path.join(results_dir, f'{name}.parquet'), compression='snappy')
+    except ImportError:
+        print('未安装 pyarrow / fastparquet，结果改写为 Excel 工作簿')
+        excel = True
+    if excel:
+        with pd.ExcelWriter(os.path.join(results_dir, f'{name}.xlsx')) as writer:
+            for d, sim in zip(dfs, sims):
+                d.to_excel(writer, sheet_name=str(sim.label)[:31], index=False)  # sheet 名最长 31 字符
+    return df
@@ -3,8 +3,6 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
-import matplotlib.pyplot as plt
-import networkx as nx
 import ContactNetwork
 
 # 定义层级配置
@@ -3,8 +3,6 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
-import matplotlib.pyplot as plt
-import networkx as nx
 import ContactNetwork
 
 # 定义层级配置
@@ -24,8 +22,11 @@ countries_config = {
     'A': 1.0
 }
 
-# 创建自定义人口
-custom_popdict, custom_keys = ContactNetwork.create_custom_population(1000, custom_config, countries_config)
+# 人口与区内接触网的随机种子（同时是缓存键的一部分）
+seed_population = 1
+
+# 创建自定义人口（按配置缓存到 myproject/cache，见 ContactNetwork.build_pop）
+custom_popdict, custom_keys = ContactNetwork.build_pop(1000, custom_config, countries_config, seed=seed_population)
 
 # 创建自定义参数
 custom_pars = {
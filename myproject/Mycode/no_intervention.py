@@ -3,16 +3,16 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
+import sys
 import matplotlib
-import matplotlib.pyplot as plt
-import networkx as nx
+# 默认只保存图片，用非交互的 Agg 后端；需要弹窗查看时加 --show 参数运行。须在 MyPlot 导入 pyplot 之前设定
+if '--show' not in sys.argv:
+    matplotlib.use('Agg')
 import ContactNetwork
 import CrossNetwork
 import MyPlot
 
-# 设置 matplotlib 显示中文（Windows 常用 SimHei / 微软雅黑）
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示为方框
+MyPlot.setup_chinese_font()
 
 # 定义层级配置
 custom_config={
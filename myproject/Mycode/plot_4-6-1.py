@@ -5,7 +5,6 @@
 """
 import os
 import sys
-import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -14,9 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import covasim as cv
 import MyPlot
 
-# 中文与负号
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False
+MyPlot.setup_chinese_font()
 
 # 结果目录与 sim 文件
 RESULTS_DIR = os.path.join(
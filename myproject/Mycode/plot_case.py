@@ -1,16 +1,12 @@
 import os
 import sys
-import matplotlib
-import matplotlib.pyplot as plt
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 import covasim as cv
 import MyPlot
-# 设置 matplotlib 显示中文（Windows 常用 SimHei / 微软雅黑）
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示为方框
+MyPlot.setup_chinese_font()
 # 保存模拟结果与图片到指定目录（传完整路径，避免 sc.makefilepath 拼接时中文名被截成只剩 .sim）
 results_dir = r'myproject\results\多层耦合网络图片\居家办公干预'
 os.makedirs(results_dir, exist_ok=True)
@@ -3,15 +3,8 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
-import matplotlib.pyplot as plt
-import matplotlib
-import networkx as nx
 import ContactNetwork
-
-# 设置 matplotlib 显示中文（Windows 常用微软雅黑/黑体）
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示为方框
-
+from my_utils import save_sims_results
 
 
 # 定义层级配置
@@ -31,8 +24,11 @@ countries_config = {
     'A': 1.0
 }
 
-# 创建自定义人口
-custom_popdict, custom_keys = ContactNetwork.create_custom_population(1000, custom_config, countries_config)
+# 人口与区内接触网的随机种子（同时是缓存键的一部分）
+seed_population = 1
+
+# 创建自定义人口（按配置缓存到 myproject/cache，见 ContactNetwork.build_pop）
+custom_popdict, custom_keys = ContactNetwork.build_pop(1000, custom_config, countries_config, seed=seed_population)
 # 创建自定义参数
 basepars = {
     # Population parameters
@@ -102,6 +98,12 @@ sim_base = cv.Sim(
 
 # 并行运行四个模拟
 if __name__ == '__main__':
+    # 绘图依赖只在主进程导入，cv.parallel 的子进程重新导入本模块时不再加载 matplotlib
+    import sys
+    import matplotlib.pyplot as plt
+    import MyPlot
+    MyPlot.setup_chinese_font()
+
     results_dir = os.path.join(os.path.dirname(__file__), '..', 'results/单区域网络图片/检测隔离情况模拟/结果延迟6天')
     msim = cv.parallel([sim_base, sim_test_isolate_20, sim_test_isolate_40, sim_test_isolate_60])
     msim.save(os.path.join(results_dir, 'test_isolate_different_ratio_cum_infections.msim'))
@@ -114,7 +116,6 @@ if __name__ == '__main__':
             sim.results['cum_infections'].values,
             label=sim.label,
         )
-        sim.to_excel(os.path.join(results_dir, f'{sim.label}.xlsx'))
     ax.set_xlabel('天数')
     ax.set_ylabel('累计感染人数')
     ax.set_title('检测隔离不同比例下累计感染人数对比')
@@ -125,3 +126,6 @@ if __name__ == '__main__':
     plt.savefig(os.path.join(results_dir, 'test_isolate_different_ratio_cum_infections.png'), dpi=150)
     plt.show()
 
+    # 各情景结果合并写入一个 Parquet 文件；需要 Excel 时加 --excel 参数运行
+    save_sims_results(msim.sims, results_dir, excel='--excel' in sys.argv)
+
@@ -3,16 +3,8 @@ import covasim as cv
 import Enums
 import sciris as sc
 import os
-import matplotlib.pyplot as plt
-import matplotlib
-import networkx as nx
 import ContactNetwork
 
-# 设置 matplotlib 显示中文（Windows 常用微软雅黑/黑体）
-matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'KaiTi', 'FangSong', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示为方框
-
-
 
 # 定义层级配置
 custom_config={
@@ -98,6 +90,11 @@ sim_base = cv.Sim(
 
 # 并行运行四个模拟
 if __name__ == '__main__':
+    # 绘图依赖只在主进程导入，cv.parallel 的子进程重新导入本模块时不再加载 matplotlib
+    import matplotlib.pyplot as plt
+    import MyPlot
+    MyPlot.setup_chinese_font()
+
     results_dir = os.path.join(os.path.dirname(__file__), '..', 'results/单区域网络图片/疫苗接种情况模拟/pfizer')
     msim = cv.parallel([sim_base, sim_vaccination_40, sim_vaccination_60, sim_vaccination_80])
     msim.save(os.path.join(results_dir, 'vaccination_different_ratio_cum_infections.msim'))
@@ -31,8 +31,7 @@ def demonstrate_transmission():
     # 获取接触网络
     contacts = people.contacts
     print("【2. 接触网络】")
-    for layer_key in contacts.keys():
-        layer = contacts[layer_key]
+    for layer_key, layer in contacts.items():
         print(f"  层 '{layer_key}': {len(layer)} 条接触边")
     print()
     
@@ -42,7 +41,7 @@ def demonstrate_transmission():
     print(f"  基础传播率 (beta): {beta}")
     
     # 获取第一层的参数
-    first_layer_key = list(contacts.keys())[0]
+    first_layer_key = next(iter(contacts))
     beta_layer = sim['beta_layer'][first_layer_key]
     print(f"  层传播权重 (beta_layer['{first_layer_key}']): {beta_layer}")
     print()
@@ -98,7 +97,6 @@ def demonstrate_transmission():
         print()
         
         # 易感者因素
-        is_sus = people.susceptible[sus_person]
         is_quar_sus = people.quarantined[sus_person]
         
         # 假设没有免疫力（简化）
@@ -1,4 +1,7 @@
+import functools
+import math
 import numpy as np
+import numba as nb
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 
@@ -17,9 +20,34 @@ def set_science_style():
         'lines.linewidth': 2.5,
     })
 
+@nb.njit(cache=True)
+def _decay_curve(t, decay_time1, decay_time2, decay_rate1, decay_rate2):
+    '''
+    指数衰减段：逐日衰减率（早期 decay_rate1，中期线性过渡，晚期 decay_rate2）的累加与 exp 在同一次遍历中完成，
+    不生成 decayRate / titre 等中间数组。
+    '''
+    out = np.empty(len(t))
+    titre = 0.0
+    n_mid = 0  # 已经过的中期天数，中期衰减率按此线性递减
+    for i in range(len(t)):
+        if t[i] > decay_time2:
+            rate = decay_rate2
+        elif t[i] > decay_time1:
+            slowing = (1.0 / (decay_time2 - decay_time1)) * (decay_rate1 - decay_rate2)
+            rate = decay_rate1 - slowing * n_mid
+            n_mid += 1
+        else:
+            rate = decay_rate1
+        if i > 0:
+            titre += rate
+        out[i] = math.exp(-titre)
+    return out
+
+@functools.lru_cache(maxsize=128)
 def nab_growth_decay(length, growth_time=21, decay_rate1=np.log(2)/50, decay_time1=150, decay_rate2=np.log(2)/250, decay_time2=365):
     '''
     生成NAb生长和衰减的动力学曲线（变化量）。
+    参数均为标量，结果按参数缓存；返回的数组只读，需要修改时请先 copy()。
     '''
     
     def f1(t, growth_time):
@@ -28,25 +56,7 @@ def nab_growth_decay(length, growth_time=21, decay_rate1=np.log(2)/50, decay_tim
 
     def f2(t, decay_time1, decay_time2, decay_rate1, decay_rate2):
         '''复杂的指数衰减'''
-        decayRate = np.full(len(t), fill_value=decay_rate1)
-        
-        # 晚期衰减率
-        mask_late = t > decay_time2
-        decayRate[mask_late] = decay_rate2
-        
-        # 中期过渡衰减率
-        mask_mid = (t > decay_time1) & (t <= decay_time2)
-        if np.any(mask_mid):
-            slowing = (1.0 / (decay_time2 - decay_time1)) * (decay_rate1 - decay_rate2)
-            indices = np.arange(np.sum(mask_mid)) 
-            decayRate[mask_mid] = decay_rate1 - slowing * indices
-
-        # 积分计算 titre
-        titre = np.zeros(len(t))
-        for i in range(1, len(t)):
-            titre[i] = titre[i-1] + decayRate[i]
-            
-        return np.exp(-titre)
+        return _decay_curve(t, decay_time1, decay_time2, decay_rate1, decay_rate2)
 
     # 构造时间轴
     calc_length = length + 1
@@ -58,6 +68,7 @@ def nab_growth_decay(length, growth_time=21, decay_rate1=np.log(2)/50, decay_tim
     
     y = np.concatenate([y1, y2])
     nab_kin = np.diff(y)[0:length]
+    nab_kin.setflags(write=False)  # 缓存中的数组由各调用方共享
     
     return nab_kin
 
@@ -11,8 +11,9 @@ pop_size = 10000
 
 # 创建基本人口属性
 uids = np.arange(pop_size, dtype=cv.default_int)
-ages = np.random.uniform(18, 65, pop_size)
-sexes = np.random.binomial(1, 0.5, pop_size)
+u = np.random.default_rng(np.random.randint(2**31)).random((2, pop_size))  # 年龄、性别所需的均匀随机数一次批量生成
+ages = 18 + 47 * u[0]  # U(18, 65)
+sexes = (u[1] < 0.5).astype(np.int64)  # Bernoulli(0.5)
 
 # 创建自定义的接触网络
 contacts = cv.Contacts()
@@ -23,7 +24,7 @@ contacts.add_layer(home=cv.Layer(**home_contacts, label='home'))
 
 # 2. 办公室层（office）- 随机接触，但只针对工作年龄的人
 work_ages = (ages >= 22) & (ages < 65)
-work_indices = np.where(work_ages)[0]
+work_indices = np.flatnonzero(work_ages)
 office_contacts = cv.make_random_contacts(len(work_indices), n=15, mapping=work_indices)
 contacts.add_layer(office=cv.Layer(**office_contacts, label='office'))
 
@@ -33,7 +34,7 @@ contacts.add_layer(restaurant=cv.Layer(**restaurant_contacts, label='restaurant'
 
 # 4. 健身房层（gym）- 随机接触，但只针对特定年龄
 gym_ages = (ages >= 20) & (ages < 50)
-gym_indices = np.where(gym_ages)[0]
+gym_indices = np.flatnonzero(gym_ages)
 gym_contacts = cv.make_random_contacts(len(gym_indices), n=8, mapping=gym_indices)
 contacts.add_layer(gym=cv.Layer(**gym_contacts, label='gym'))
 
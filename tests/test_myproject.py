@@ -0,0 +1,178 @@
+'''
+myproject/Mycode 中区域辅助函数与多层网络干预的测试：无放回抽样内核、区域掩码的增量更新（move_to / moved_since）
+及 CrosserTravelMultilayer / MaskWearingLayerSpecific 增量写入的 beta 与逐日全量重算一致。
+'''
+
+#%% Imports and settings
+import os
+import sys
+import numpy as np
+import sciris as sc
+import covasim as cv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'myproject', 'Mycode'))
+import ContactNetwork # noqa: E402
+import CrossNetwork # noqa: E402
+import my_utils as mu # noqa: E402
+import my_intervention as mi # noqa: E402
+
+cv.options.set(interactive=False) # Assume not running interactively
+
+
+def make_sim(n_days=40, pop_size=2000, interventions=None):
+    ''' 两区（A、B）多层人口 + 跨区层的小规模 sim '''
+    layer_config = {
+        'community': {'network_type': 'scale_free', 'm_connections': 3},
+        'work': {'network_type': 'random', 'n_contacts': 8, 'age_range': (22, 65)},
+        'school': {'network_type': 'random', 'n_contacts': 8, 'age_range': (6, 22)},
+        'home': {'network_type': 'microstructured', 'cluster_size': 3.0},
+    }
+    popdict, _ = ContactNetwork.create_custom_population(pop_size, layer_config, {'A': 2, 'B': 1}, seed=1)
+    popdict = CrossNetwork.add_cross_layer_multilayer(popdict, frac_travelers=0.1, n_cross_per_person=3,
+                                                      cross_layer_seed=2, region_a='A', region_b='B')
+    pars = dict(pop_size=pop_size, pop_infected=20, n_days=n_days, rand_seed=1, verbose=0,
+                beta_layer={'home': 3, 'school': 0.6, 'work': 0.6, 'community': 0.3,
+                            'cross_work': 0.6, 'cross_community': 0.6, 'cross_home': 0.6})
+    sim = cv.Sim(pars=pars, interventions=interventions)
+    sim.popdict = popdict
+    sim.reset_layer_pars(force=True)
+    sim.initialize()
+    return sim
+
+
+#%% Define the tests
+
+def test_sample_without_replacement():
+    sc.heading('Testing _sample_without_replacement (Floyd and Fisher-Yates branches)')
+    inds = np.arange(100, 1100) # n = 1000
+    for k in [0, 1, 10, 249, 250, 600, 1000]: # k*4 < n 走 Floyd，否则走部分 Fisher-Yates
+        for seed in range(5):
+            cv.set_seed(seed)
+            out = mi._sample_without_replacement(inds, k)
+            assert len(out) == k
+            assert len(np.unique(out)) == k
+            assert np.isin(out, inds).all()
+    return
+
+
+def test_sample_from_mask():
+    sc.heading('Testing _sample_from_mask')
+    rng = np.random.default_rng(0)
+    mask = rng.random(5000) < 0.3
+    n_true = int(mask.sum())
+    out = np.empty(len(mask), dtype=np.int64)
+    for k in [0, 1, 50, n_true // 2, n_true]:
+        cv.set_seed(k)
+        sample = mi._sample_from_mask(mask, k, n_true, out)
+        assert len(sample) == k
+        assert (np.diff(sample) > 0).all() # 严格升序，即排序且无重复
+        assert mask[sample].all()
+    return
+
+
+def test_move_log():
+    sc.heading('Testing move_to / moved_since round trip')
+    sim = make_sim(n_days=5)
+    names, country, position = mu.region_codes(sim)
+    code_a, code_b = mu.region_code(sim, 'A'), mu.region_code(sim, 'B')
+    reader = object()
+    assert mu.moved_since(sim, reader) is None # 首次读取须全量重算
+
+    inds = np.flatnonzero(country == code_a)[:10]
+    mu.move_to(sim, inds, np.full(len(inds), code_b, dtype=np.int8))
+    moved = mu.moved_since(sim, reader)
+    assert np.array_equal(np.sort(moved), np.sort(inds))
+    assert (np.asarray(sim.people.position)[inds] == 'B').all()
+    assert (position[inds] == code_b).all()
+    assert mu.abroad_mask(sim)[inds].all()
+    assert len(mu.moved_since(sim, reader)) == 0 # 已读过的记录不再返回
+
+    mu.move_to(sim, inds, country[inds])
+    assert np.array_equal(np.sort(mu.moved_since(sim, reader)), np.sort(inds))
+    assert not mu.abroad_mask(sim)[inds].any()
+    assert len(sim.people._region_state.log) == 0 # 唯一的读取方已读完，记录被丢弃
+
+    other = sc.dcp(sim) # 区域状态随 people 复制，互不共享
+    mu.move_to(other, inds, np.full(len(inds), code_b, dtype=np.int8))
+    assert len(mu.moved_since(sim, reader)) == 0
+    assert not mu.abroad_mask(sim)[inds].any()
+    return
+
+
+def test_incremental_masks():
+    sc.heading('Testing incrementally updated masks against a full recompute')
+
+    class Check(cv.Intervention):
+        ''' 每日在所有干预之后，将增量维护的掩码与 beta 和全量重算结果比较 '''
+        def apply(self, sim):
+            people = sim.people
+            in_a = np.asarray(people.position) == 'A'
+            abroad = np.asarray(people.position) != np.asarray(people.country)
+            assert np.array_equal(mu.in_region_mask(sim), in_a)
+            assert np.array_equal(mu.abroad_mask(sim), abroad)
+            assert np.array_equal(subtarget['vals'](sim), in_a)
+            masks = [intv for intv in sim['interventions'] if isinstance(intv, mi.MaskWearingLayerSpecific)
+                     and intv.start_day <= sim.t and (intv.end_day is None or sim.t <= intv.end_day)]
+            for lkey in ['home', 'school', 'work', 'community']:
+                layer = people.contacts[lkey]
+                p1, p2 = layer['p1'], layer['p2']
+                edge_abroad = abroad[p1] | abroad[p2]
+                domestic_in_a = (in_a[p1] | in_a[p2]) & ~edge_abroad
+                expected = np.ones(len(p1))
+                for intv in masks:
+                    if lkey in intv.layers:
+                        assert np.array_equal(intv._domestic[lkey][2], domestic_in_a)
+                        expected[domestic_in_a] = intv.efficacy
+                expected[edge_abroad] = 0
+                assert np.array_equal(layer['beta'], expected), (sim.t, lkey)
+            self.n_checked = getattr(self, 'n_checked', 0) + 1
+
+    subtarget = mu.make_subtarget_position()
+    interventions = [
+        mi.CrosserTravelMultilayer(frac_cross_per_day=0.2, duration_min=1, duration_max=4, seed=3),
+        mi.MaskWearingLayerSpecific(layers=['work', 'school'], efficacy=0.5, start_day=5),
+        mi.MaskWearingLayerSpecific(layers=['community', 'work'], efficacy=0.5, start_day=10, end_day=20),
+        cv.test_prob(symp_prob=0.2, asymp_prob=0.01, subtarget=subtarget),
+        Check(),
+    ]
+    sim = make_sim(n_days=30, interventions=interventions)
+    sim.run()
+    assert sim['interventions'][-1].n_checked == sim.npts
+    assert len(sim.people._region_state.log) == 0 # 每日读取方均已读完
+    return sim
+
+
+def test_build_pop_unseeded():
+    sc.heading('Testing that unseeded build_pop calls bypass the population cache')
+    layer_config = {'community': {'network_type': 'random', 'n_contacts': 4}}
+    cache_dir = sc.thispath() / 'temp_pop_cache'
+    try:
+        pop1, _ = ContactNetwork.build_pop(300, layer_config, {'A': 1, 'B': 1}, cache_dir=cache_dir)
+        pop2, _ = ContactNetwork.build_pop(300, layer_config, {'A': 1, 'B': 1}, cache_dir=cache_dir)
+        assert pop1 is not pop2
+        assert not np.array_equal(pop1['contacts']['community']['p1'], pop2['contacts']['community']['p1'])
+        assert not os.path.exists(cache_dir) # 未写入缓存
+
+        seeded1, _ = ContactNetwork.build_pop(300, layer_config, {'A': 1, 'B': 1}, seed=1, cache_dir=cache_dir)
+        seeded2, _ = ContactNetwork.build_pop(300, layer_config, {'A': 1, 'B': 1}, seed=1, cache_dir=cache_dir)
+        assert len(os.listdir(cache_dir)) == 1
+        assert np.array_equal(seeded1['contacts']['community']['p1'], seeded2['contacts']['community']['p1'])
+    finally:
+        sc.rmpath(cache_dir, die=False)
+    return
+
+
+#%% Run as a script
+if __name__ == '__main__':
+
+    T = sc.tic()
+
+    test_sample_without_replacement()
+    test_sample_from_mask()
+    test_move_log()
+    sim = test_incremental_masks()
+    test_build_pop_unseeded()
+
+    print('\n'*2)
+    sc.toc(T)
+    print('Done.')